@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 import os
+import sys
 from datetime import timedelta
 from pathlib import Path
 
@@ -54,6 +55,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "utils.metrics.InstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -61,9 +63,19 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    # "querycount.middleware.QueryCountMiddleware",
 ]
 
+# Request metrics are served on /metrics/ to these addresses only.
+INTERNAL_IPS = os.getenv("INTERNAL_IPS", "127.0.0.1,::1").split(",")
+
+# Extra per-endpoint query budgets on top of the ``query_budgets`` declared on
+# views, keyed by URL name or "<URL name>:<action>".
+QUERY_BUDGETS = {}
+# Raise instead of logging a warning when a budget is exceeded, always on in
+# the test suite so a new query on a budgeted endpoint fails its tests.
+TESTING = len(sys.argv) > 1 and sys.argv[1] == "test"
+QUERY_BUDGET_ENFORCE = os.getenv("QUERY_BUDGET_ENFORCE", str(TESTING)).lower() == "true"
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
@@ -101,6 +113,50 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Use a backend shared between workers (redis, memcached, file based) in
+# production, otherwise catalog invalidation only reaches the local process.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", "e-learning"),
+    }
+}
+
+COURSE_CATALOG_CACHE_TIMEOUT = int(os.getenv("COURSE_CATALOG_CACHE_TIMEOUT", 300))
+
+
+# Authenticated users are kept in a per-process LRU keyed by user id and
+# validated against a version stamp stored in the cache above.
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", 30))
+AUTH_USER_CACHE_MAXSIZE = int(os.getenv("AUTH_USER_CACHE_MAXSIZE", 10000))
+
+
+# Lesson progress
+# When enabled lesson completions are queued in a local append log and
+# written by `python manage.py drain_progress_queue`.
+LESSON_PROGRESS_WRITE_BEHIND = (
+    os.getenv("LESSON_PROGRESS_WRITE_BEHIND", "False").lower() == "true"
+)
+LESSON_PROGRESS_QUEUE_PATH = os.getenv(
+    "LESSON_PROGRESS_QUEUE_PATH", BASE_DIR / "progress_queue.sqlite3"
+)
+# Lesson ids accepted by one bulk mark-as-completed request, keeps its IN
+# lists well under SQLite's bound parameter limit.
+LESSON_BULK_COMPLETE_MAX_IDS = int(os.getenv("LESSON_BULK_COMPLETE_MAX_IDS", 500))
+
+
+# Course analytics
+# Daily rollups are advanced by `python manage.py update_analytics_rollups`.
+# Rows younger than the lag in seconds are left for the next run, so writes
+# of transactions still in flight are not skipped by the watermark.
+ANALYTICS_ROLLUP_LAG = int(os.getenv("ANALYTICS_ROLLUP_LAG", 60))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -147,9 +203,19 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework.authentication.SessionAuthentication",
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
+    ),
+    "DEFAULT_PAGINATION_CLASS": "utils.pagination.LimitOffsetPagination",
+    # orjson is used when installed, both fall back to the stdlib json module.
+    "DEFAULT_RENDERER_CLASSES": (
+        "utils.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "utils.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ),
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 100,
 }
 
@@ -1,12 +1,18 @@
 from django.contrib import admin
 from django.urls import include, path
-from drf_spectacular.views import (SpectacularAPIView, SpectacularRedocView,
-                                   SpectacularSwaggerView)
+from drf_spectacular.views import (
+    SpectacularAPIView,
+    SpectacularRedocView,
+    SpectacularSwaggerView,
+)
+
+from utils.metrics import metrics_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     # API endpoints:
     path("api/v1/courses/", include("courses.urls")),
+    path("api/v1/async/courses/", include("courses.async_urls")),
     path("api/v1/enrollments/", include("enrollments.urls")),
     path("api/v1/users/", include("users.urls")),
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
@@ -20,4 +26,5 @@ urlpatterns = [
         SpectacularRedocView.as_view(url_name="schema"),
         name="redoc",
     ),
+    path("metrics/", metrics_view, name="metrics"),
 ]
@@ -1,11 +1,96 @@
-# courses/admin.py
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.widgets import AutocompleteSelect
+
+from utils.pagination import EstimatedCountPaginator
 
 from .models import Course, Lesson
 
 
+class CourseAutocompleteFilter(admin.ListFilter):
+    """
+    Course filter backed by the admin autocomplete view, the sidebar no
+    longer loads every course to list them as choices.
+    """
+
+    title = "course"
+    parameter_name = "course__id__exact"
+    widget_id = "course-autocomplete-filter"
+    template = "admin/courses/autocomplete_filter.html"
+
+    def __init__(self, request, params, model, model_admin):
+        super().__init__(request, params, model, model_admin)
+        self.admin_site = model_admin.admin_site
+        self.value = params.pop(self.parameter_name, None)
+        self.base_query_string = "?"
+
+    @classmethod
+    def get_widget(cls, admin_site):
+        # Bound to a form field so only the selected course is queried.
+        field = forms.ModelChoiceField(
+            queryset=Course.objects.all(),
+            widget=AutocompleteSelect(
+                Lesson._meta.get_field("course"),
+                admin_site,
+                attrs={"id": cls.widget_id},
+            ),
+        )
+        return field.widget
+
+    def rendered_widget(self):
+        return self.get_widget(self.admin_site).render(self.parameter_name, self.value)
+
+    def has_output(self):
+        return True
+
+    def expected_parameters(self):
+        return [self.parameter_name]
+
+    def choices(self, changelist):
+        self.base_query_string = changelist.get_query_string(
+            remove=[self.parameter_name]
+        )
+        yield {
+            "selected": self.value is None,
+            "query_string": self.base_query_string,
+            "display": "All",
+        }
+
+    def queryset(self, request, queryset):
+        if self.value is None:
+            return queryset
+        try:
+            return queryset.filter(course_id=int(self.value))
+        except ValueError as exc:
+            raise IncorrectLookupParameters(exc)
+
+
+class LessonForm(forms.ModelForm):
+    """
+    Edits the lesson body, which lives in the content store.
+    """
+
+    content = forms.CharField(required=False, widget=forms.Textarea)
+
+    class Meta:
+        model = Lesson
+        fields = "__all__"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk is not None:
+            self.initial.setdefault("content", self.instance.content)
+
+    def save(self, commit=True):
+        if "content" in self.changed_data:
+            self.instance.content = self.cleaned_data["content"]
+        return super().save(commit)
+
+
 class LessonInline(admin.StackedInline):
     model = Lesson
+    form = LessonForm
     extra = 1
     fields = ("title", "description", "video_url", "is_active", "content")
     show_change_link = True
@@ -14,12 +99,17 @@ class LessonInline(admin.StackedInline):
 class CourseAdmin(admin.ModelAdmin):
     list_display = ("title", "instructor", "is_published", "has_enrollments_display")
     list_filter = ("is_published",)
+    list_select_related = ("instructor",)
     search_fields = ("title", "description", "instructor__username")
     inlines = [LessonInline]
     readonly_fields = ("has_enrollments_display",)
+    # Same order as the changelist default, also used by the autocomplete view.
+    ordering = ("-pk",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     def get_queryset(self, request):
-        qs = super().get_queryset(request)
+        qs = super().get_queryset(request).with_enrollments_exist()
         if request.user.is_superuser:
             return qs
         elif request.user.is_instructor:
@@ -27,16 +117,33 @@ class CourseAdmin(admin.ModelAdmin):
         return qs.none()
 
     def has_enrollments_display(self, obj):
-        return obj.has_enrollments()
+        if obj.pk is None:
+            return False
+        enrollments_exist = getattr(obj, "enrollments_exist", None)
+        if enrollments_exist is None:
+            return obj.has_enrollments()
+        return enrollments_exist
 
     has_enrollments_display.boolean = True
     has_enrollments_display.short_description = "Has Enrollments"
+    has_enrollments_display.admin_order_field = "enrollments_exist"
 
 
 class LessonAdmin(admin.ModelAdmin):
-    list_display = ("title", "course", "is_active")
-    list_filter = ("is_active", "course")
+    form = LessonForm
+    list_display = ("title", "course", "is_active", "content_size")
+    readonly_fields = ("content_blob", "content_size")
+    list_filter = ("is_active", CourseAutocompleteFilter)
+    list_select_related = ("course",)
     search_fields = ("title", "description", "course__title")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    @property
+    def media(self):
+        return (
+            super().media + CourseAutocompleteFilter.get_widget(self.admin_site).media
+        )
 
 
 admin.site.register(Course, CourseAdmin)
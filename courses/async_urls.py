@@ -0,0 +1,14 @@
+from django.urls import path
+
+from . import async_views
+
+urlpatterns = [
+    path("", async_views.course_list, name="async-course-list"),
+    path("lessons/", async_views.lesson_list, name="async-lesson-list"),
+    path("<int:pk>/", async_views.course_detail, name="async-course-detail"),
+    path(
+        "<int:pk>/get_progress/",
+        async_views.course_progress,
+        name="async-course-get-progress",
+    ),
+]
@@ -0,0 +1,340 @@
+"""
+ASGI native, read only variants of the hot course endpoints.
+
+They mirror the payloads of ``CourseModelViewSet`` and ``LessonViewSet`` but
+run on Django's async ORM, so under ASGI a request does not hold a worker
+thread while it waits on the database. The lists take the same filter,
+search, ``limit``, ``offset`` and ``count`` parameters as the sync lists,
+they do not support sparse fieldsets or keyset pagination.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import Exists, OuterRef
+from django.http import JsonResponse
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed as JWTAuthenticationFailed,
+)
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from enrollments.models import Enrollment
+from users.authentication import CachedJWTAuthentication
+from utils.pagination import LimitOffsetPagination
+
+from .models import Course, Lesson
+from .views import CourseModelViewSet, LessonViewSet
+
+User = get_user_model()
+
+COURSE_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "instructor_id",
+    "instructor__username",
+    "instructor__role",
+    "is_published",
+)
+SUMMARY_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "instructor_id",
+    "instructor_username",
+    "instructor_role",
+    "lessons_count",
+)
+LESSON_FIELDS = (
+    "id",
+    "title",
+    "course",
+    "description",
+    "video_url",
+    "content_blob",
+    "content_size",
+    "is_active",
+)
+
+
+class AuthenticationFailed(Exception):
+    pass
+
+
+async def aget_user(request):
+    """
+    Resolve the user from a JWT bearer token through the shared user cache,
+    falling back to the session user.
+    """
+    authentication = CachedJWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        return await sync_to_async(lambda: request.user)()
+    try:
+        token = authentication.get_validated_token(raw_token)
+        return await authentication.aget_user(token)
+    except (InvalidToken, TokenError):
+        raise AuthenticationFailed("Given token not valid for any token type")
+    except JWTAuthenticationFailed as exc:
+        raise AuthenticationFailed(str(exc.detail))
+
+
+def authenticated(view):
+    async def wrapper(request, *args, **kwargs):
+        try:
+            user = await aget_user(request)
+        except AuthenticationFailed as exc:
+            return JsonResponse({"detail": str(exc)}, status=401)
+        return await view(request, user or AnonymousUser(), *args, **kwargs)
+
+    wrapper.__name__ = view.__name__
+    return wrapper
+
+
+def error(message, status=400):
+    # Same shape as a DRF ValidationError raised with a plain string.
+    return JsonResponse([message], safe=False, status=status)
+
+
+def not_found():
+    return JsonResponse({"detail": "No Course matches the given query."}, status=404)
+
+
+def serialize_course(row):
+    return {
+        "id": row["id"],
+        "title": row["title"],
+        "description": row["description"],
+        "instructor": {
+            "id": row["instructor_id"],
+            "username": row["instructor__username"],
+            "role": row["instructor__role"],
+        },
+        "is_published": row["is_published"],
+    }
+
+
+def serialize_summary(row):
+    return {
+        "id": row["id"],
+        "title": row["title"],
+        "description": row["description"],
+        "instructor": {
+            "id": row["instructor_id"],
+            "username": row["instructor_username"],
+            "role": row["instructor_role"],
+        },
+        "is_published": True,
+        "lessons_count": row["lessons_count"],
+        "is_enrolled": row.get("is_enrolled", False),
+    }
+
+
+def serialize_lesson(row):
+    return {
+        "id": row["id"],
+        "title": row["title"],
+        "course": row["course"],
+        "description": row["description"],
+        "video_url": row["video_url"],
+        "content_hash": row["content_blob"],
+        "content_size": row["content_size"],
+        "is_active": row["is_active"],
+    }
+
+
+def get_list_view(viewset, request, user):
+    """
+    Instance of the sync ``viewset`` for a list request, to reuse its query
+    parameter handling.
+    """
+    request = Request(request)
+    request.user = user
+    return viewset(
+        request=request, action="list", args=(), kwargs={}, format_kwarg=None
+    )
+
+
+def filter_queryset(view, queryset):
+    # The filter backends of the sync list, without its sparse fieldsets.
+    for backend in view.filter_backends:
+        queryset = backend().filter_queryset(view.request, queryset, view)
+    return queryset
+
+
+async def paginate(request, queryset, serialize):
+    try:
+        limit = int(request.GET.get("limit", settings.REST_FRAMEWORK["PAGE_SIZE"]))
+        offset = max(int(request.GET.get("offset", 0)), 0)
+    except ValueError:
+        return error("limit and offset must be integers.")
+    limit = max(limit, 1)
+
+    if LimitOffsetPagination().should_count(request):
+        count = await queryset.acount()
+        rows = [row async for row in queryset[offset : offset + limit]]
+        has_next = offset + limit < count
+    else:
+        # Same as the sync pagination, one extra row instead of a count.
+        count = None
+        rows = [row async for row in queryset[offset : offset + limit + 1]]
+        has_next = len(rows) > limit
+    results = [serialize(row) for row in rows[:limit]]
+
+    url = request.build_absolute_uri()
+    url = replace_query_param(url, "limit", limit)
+    next_url = None
+    if has_next:
+        next_url = replace_query_param(url, "offset", offset + limit)
+    previous_url = None
+    if offset > 0:
+        previous_url = (
+            remove_query_param(url, "offset")
+            if offset - limit <= 0
+            else replace_query_param(url, "offset", offset - limit)
+        )
+    return JsonResponse(
+        {
+            "count": count,
+            "next": next_url,
+            "previous": previous_url,
+            "results": results,
+        }
+    )
+
+
+async def filter_and_paginate(view, queryset, serialize):
+    # Filter forms may query the database to validate a choice.
+    try:
+        queryset = await sync_to_async(filter_queryset)(view, queryset)
+    except ValidationError as exc:
+        return JsonResponse(exc.detail, safe=False, status=400)
+    return await paginate(view.request, queryset, serialize)
+
+
+@authenticated
+async def course_list(request, user):
+    view = get_list_view(CourseModelViewSet, request, user)
+    if user.is_authenticated and user.is_instructor:
+        queryset = Course.objects.filter(instructor=user)
+    elif view.use_course_summaries():
+        # The published catalog is served from the CourseSummary read model.
+        queryset = view.get_summary_queryset()
+        fields = SUMMARY_FIELDS
+        if user.is_authenticated and user.is_student:
+            queryset = queryset.annotate(
+                is_enrolled=Exists(
+                    Enrollment.objects.filter(course=OuterRef("pk"), user=user)
+                )
+            )
+            fields += ("is_enrolled",)
+        return await paginate(view.request, queryset.values(*fields), serialize_summary)
+    else:
+        queryset = Course.objects.filter(is_published=True)
+    queryset = queryset.with_lessons_count().order_by("created_at", "id")
+    fields = COURSE_FIELDS + ("lessons_count",)
+    if user.is_authenticated and user.is_student:
+        queryset = queryset.with_is_enrolled(user)
+        fields += ("is_enrolled",)
+
+    def serialize(row):
+        return {
+            **serialize_course(row),
+            "lessons_count": row["lessons_count"],
+            "is_enrolled": row.get("is_enrolled", False),
+        }
+
+    return await filter_and_paginate(view, queryset.values(*fields), serialize)
+
+
+@authenticated
+async def course_detail(request, user, pk):
+    if not user.is_authenticated:
+        if not await Course.objects.filter(pk=pk, is_published=True).aexists():
+            return not_found()
+        return error("You must be authenticated to see course details.")
+    if user.is_instructor:
+        queryset = Course.objects.filter(instructor=user)
+        fields = COURSE_FIELDS
+    else:
+        queryset = Course.objects.filter(is_published=True).with_is_enrolled(user)
+        fields = COURSE_FIELDS + ("is_enrolled",)
+    try:
+        course = await queryset.values(*fields).aget(pk=pk)
+    except Course.DoesNotExist:
+        return not_found()
+    if not user.is_instructor and not course["is_enrolled"]:
+        return error("To see course details you must be enroll it.")
+
+    lessons = Lesson.objects.filter(course_id=pk, is_active=True).values(*LESSON_FIELDS)
+    return JsonResponse(
+        {
+            **serialize_course(course),
+            "lessons": [serialize_lesson(lesson) async for lesson in lessons],
+        }
+    )
+
+
+@authenticated
+async def lesson_list(request, user):
+    if not user.is_authenticated:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."}, status=401
+        )
+    queryset = Lesson.objects.all()
+    if user.is_student:
+        queryset = queryset.filter(is_active=True, course__enrollments__user=user)
+    if user.is_instructor:
+        queryset = queryset.filter(course__instructor=user)
+    view = get_list_view(LessonViewSet, request, user)
+    return await filter_and_paginate(
+        view, queryset.values(*LESSON_FIELDS), serialize_lesson
+    )
+
+
+@authenticated
+async def course_progress(request, user, pk):
+    user_id = request.GET.get("user_id")
+    if user_id is None:
+        return error("user_id parameter is required.")
+
+    enrollments = Enrollment.objects.filter(user__role=User.Role.STUDENT)
+    if user.is_authenticated and user.is_instructor:
+        courses = Course.objects.filter(instructor=user)
+        enrollments = enrollments.filter(course__instructor=user)
+    else:
+        courses = Course.objects.filter(is_published=True)
+        enrollments = enrollments.filter(course__is_published=True)
+    enrollment = await enrollments.filter(course_id=pk, user_id=user_id).afirst()
+
+    if enrollment is None:
+        student = await User.objects.filter(pk=user_id).afirst()
+        if student is None:
+            return JsonResponse(
+                {"detail": "No User matches the given query."}, status=404
+            )
+        if not await courses.filter(pk=pk).aexists():
+            return not_found()
+        if not student.is_student:
+            return error("User must be a student to get progress.")
+        return error("User is not enrolled in this course.")
+
+    if settings.LESSON_PROGRESS_WRITE_BEHIND:
+        from enrollments.queue import count_pending_completions, get_progress_queue
+
+        enrollment.completed_lessons += await sync_to_async(count_pending_completions)(
+            enrollment, get_progress_queue()
+        )
+
+    return JsonResponse(
+        {
+            "progress": enrollment.progress,
+            "completed_lessons": enrollment.completed_lessons,
+            "lessons_count": enrollment.active_lessons,
+        }
+    )
@@ -0,0 +1,98 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+CATALOG_VERSION_KEY = "courses:catalog:version"
+
+
+def get_catalog_version():
+    """
+    Current version of the published catalog. Every cached catalog page key
+    carries it, so bumping the version invalidates all pages at once.
+    """
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # Seed with a timestamp so an evicted counter never reuses old keys.
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def get_catalog_page_key(request):
+    """
+    Versioned cache key of the catalog page of the request. Read it once
+    before querying and pass it on, a page built under an older version must
+    not be stored under the key of a newer one.
+    """
+    url = request.build_absolute_uri()
+    digest = hashlib.md5(url.encode(), usedforsecurity=False).hexdigest()
+    return f"courses:catalog:{get_catalog_version()}:{digest}"
+
+
+def get_cached_catalog_page(key):
+    return cache.get(key)
+
+
+def set_cached_catalog_page(key, data):
+    cache.set(key, data, timeout=settings.COURSE_CATALOG_CACHE_TIMEOUT)
+
+
+def get_cached_catalog_validators(key):
+    return cache.get(f"{key}:validators")
+
+
+def set_cached_catalog_validators(key, aggregates):
+    """
+    Cache the ETag aggregates of a catalog page next to the page itself, they
+    go stale on the same catalog version bump.
+    """
+    cache.set(
+        f"{key}:validators",
+        aggregates,
+        timeout=settings.COURSE_CATALOG_CACHE_TIMEOUT,
+    )
+
+
+def get_enrolled_course_ids_key(user_id):
+    return f"courses:enrolled:{user_id}"
+
+
+def get_enrolled_course_ids(user):
+    key = get_enrolled_course_ids_key(user.pk)
+    course_ids = cache.get(key)
+    if course_ids is None:
+        course_ids = set(user.enrollments.values_list("course_id", flat=True))
+        cache.set(key, course_ids, timeout=settings.COURSE_CATALOG_CACHE_TIMEOUT)
+    return course_ids
+
+
+def invalidate_enrolled_course_ids(*user_ids):
+    cache.delete_many([get_enrolled_course_ids_key(user_id) for user_id in user_ids])
+
+
+def overlay_enrollments(data, user):
+    """
+    Set ``is_enrolled`` on a cached, user independent catalog page.
+    """
+    course_ids = get_enrolled_course_ids(user)
+    results = data["results"] if isinstance(data, dict) else data
+    results = [
+        (
+            {**course, "is_enrolled": course["id"] in course_ids}
+            if "is_enrolled" in course
+            else course
+        )
+        for course in results
+    ]
+    if isinstance(data, dict):
+        return {**data, "results": results}
+    return results
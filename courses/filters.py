@@ -15,5 +15,5 @@ class CourseFilter(django_filters.FilterSet):
     def get_enrolled_courses(self, queryset, name, value):
         user = self.request.user
         if user.is_authenticated and user.is_student and value:
-            queryset = queryset.filter(enrollments__user=user).distinct()
+            queryset = queryset.enrolled(user)
         return queryset
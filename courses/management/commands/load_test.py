@@ -0,0 +1,74 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Load a running server with concurrent GET requests and report the "
+        "throughput and latency of each path, e.g. a sync list next to its "
+        "async variant. Run it once against the server under WSGI and once "
+        "under ASGI, --server labels the results of each run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths",
+            nargs="*",
+            default=["/api/v1/courses/", "/api/v1/async/courses/"],
+            help="Paths to request, each one is measured separately.",
+        )
+        parser.add_argument(
+            "--server",
+            choices=["wsgi", "asgi"],
+            required=True,
+            help="How the server under test is run, e.g. gunicorn or uvicorn.",
+        )
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--token", help="JWT access token sent as a bearer.")
+        parser.add_argument("--host", help="Host header, one of ALLOWED_HOSTS.")
+        parser.add_argument("--timeout", type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        headers = {"Accept": "application/json"}
+        if options["token"]:
+            headers["Authorization"] = f"Bearer {options['token']}"
+        if options["host"]:
+            headers["Host"] = options["host"]
+
+        def fetch(url):
+            started = time.perf_counter()
+            try:
+                with urlopen(
+                    Request(url, headers=headers), timeout=options["timeout"]
+                ) as r:
+                    r.read()
+                    status = r.status
+            except HTTPError as exc:
+                status = exc.code
+            return status, time.perf_counter() - started
+
+        for path in options["paths"]:
+            url = options["base_url"].rstrip("/") + path
+            started = time.perf_counter()
+            with ThreadPoolExecutor(options["concurrency"]) as executor:
+                results = list(executor.map(fetch, [url] * options["requests"]))
+            elapsed = time.perf_counter() - started
+
+            latencies = sorted(latency for _, latency in results)
+            errors = sum(1 for status, _ in results if status >= 400)
+            p95 = latencies[int((len(latencies) - 1) * 0.95)]
+            p99 = latencies[int((len(latencies) - 1) * 0.99)]
+            self.stdout.write(
+                f"[{options['server']}] {path}: "
+                f"{len(results) / elapsed:.1f} req/s, "
+                f"p50 {statistics.median(latencies) * 1000:.1f} ms, "
+                f"p95 {p95 * 1000:.1f} ms, p99 {p99 * 1000:.1f} ms, "
+                f"{errors} errors"
+            )
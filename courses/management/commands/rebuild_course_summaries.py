@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from courses.summary import rebuild_course_summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild the CourseSummary catalog read model from the course tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of courses summarized per query.",
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_course_summaries(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} course summaries."))
@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-17 03:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0003_lesson_is_active_alter_lesson_course"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="course",
+            index=models.Index(
+                fields=["created_at", "id"], name="course_created_at_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lesson",
+            index=models.Index(
+                fields=["created_at", "id"], name="lesson_created_at_id_idx"
+            ),
+        ),
+    ]
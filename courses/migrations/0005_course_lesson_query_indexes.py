@@ -0,0 +1,42 @@
+# Generated by Django 4.2 on 2026-10-17 03:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0004_course_lesson_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="lesson",
+            name="course",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="lessons",
+                to="courses.course",
+                verbose_name="Course",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="course",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=["created_at", "id"],
+                name="course_published_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lesson",
+            index=models.Index(
+                fields=["course", "is_active", "created_at"],
+                name="lesson_course_active_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 4.2 on 2026-10-17 03:54
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    "CREATE INDEX course_search_vector_idx ON courses_course "
+    "USING gin (search_vector)",
+    "CREATE INDEX lesson_search_vector_idx ON courses_lesson "
+    "USING gin (search_vector)",
+    "UPDATE courses_course c SET search_vector = "
+    "setweight(to_tsvector(coalesce(c.title, '')), 'A') || "
+    "setweight(to_tsvector(coalesce(c.description, '')), 'B') || "
+    "setweight(to_tsvector(coalesce(u.username, '')), 'C') "
+    "FROM users_user u WHERE u.id = c.instructor_id",
+    "UPDATE courses_lesson l SET search_vector = "
+    "setweight(to_tsvector(coalesce(l.title, '')), 'A') || "
+    "setweight(to_tsvector(coalesce(l.description, '')), 'B') || "
+    "setweight(to_tsvector(coalesce(c.title, '')), 'C') || "
+    "setweight(to_tsvector(coalesce(c.description, '')), 'D') "
+    "FROM courses_course c WHERE c.id = l.course_id",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS course_search_vector_idx",
+    "DROP INDEX IF EXISTS lesson_search_vector_idx",
+]
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE courses_course_fts USING fts5"
+    "(title, description, instructor)",
+    "CREATE VIRTUAL TABLE courses_lesson_fts USING fts5"
+    "(title, description, course_title, course_description)",
+    "INSERT INTO courses_course_fts (rowid, title, description, instructor) "
+    "SELECT c.id, c.title, c.description, u.username FROM courses_course c "
+    "JOIN users_user u ON u.id = c.instructor_id",
+    "INSERT INTO courses_lesson_fts "
+    "(rowid, title, description, course_title, course_description) "
+    "SELECT l.id, l.title, l.description, c.title, c.description "
+    "FROM courses_lesson l LEFT JOIN courses_course c ON c.id = l.course_id",
+]
+SQLITE_BACKWARD = [
+    "DROP TABLE IF EXISTS courses_course_fts",
+    "DROP TABLE IF EXISTS courses_lesson_fts",
+]
+
+
+def run_for_vendor(postgres, sqlite):
+    def run(apps, schema_editor):
+        statements = {"postgresql": postgres, "sqlite": sqlite}.get(
+            schema_editor.connection.vendor, []
+        )
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0005_course_lesson_query_indexes"),
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="lesson",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(
+            run_for_vendor(POSTGRES_FORWARD, SQLITE_FORWARD),
+            run_for_vendor(POSTGRES_BACKWARD, SQLITE_BACKWARD),
+        ),
+    ]
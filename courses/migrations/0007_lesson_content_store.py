@@ -0,0 +1,106 @@
+# Generated by Django 4.2 on 2026-10-17 04:17
+
+import hashlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def iter_batches(queryset):
+    """
+    Lists of ``BATCH_SIZE`` rows in primary key order. Each batch is a new
+    query, rows written between them are not read from an open cursor.
+    """
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk).order_by("pk")[:BATCH_SIZE])
+        if not batch:
+            return
+        yield batch
+        last_pk = batch[-1].pk
+
+
+def move_content_to_store(apps, schema_editor):
+    Lesson = apps.get_model("courses", "Lesson")
+    LessonContent = apps.get_model("courses", "LessonContent")
+
+    lessons = (
+        Lesson.objects.exclude(content__isnull=True)
+        .exclude(content="")
+        .only("pk", "content")
+    )
+    for batch in iter_batches(lessons):
+        contents = {}
+        for lesson in batch:
+            data = lesson.content.encode()
+            content = LessonContent(
+                hash=hashlib.sha256(data).hexdigest(),
+                body=lesson.content,
+                size=len(data),
+            )
+            contents[content.hash] = content
+            lesson.content_blob_id = content.hash
+            lesson.content_size = content.size
+        LessonContent.objects.bulk_create(contents.values(), ignore_conflicts=True)
+        Lesson.objects.bulk_update(batch, ["content_blob", "content_size"])
+
+
+def move_content_to_lessons(apps, schema_editor):
+    Lesson = apps.get_model("courses", "Lesson")
+
+    lessons = Lesson.objects.exclude(content_blob__isnull=True).only(
+        "pk", "content_blob__body"
+    )
+    for batch in iter_batches(lessons.select_related("content_blob")):
+        for lesson in batch:
+            lesson.content = lesson.content_blob.body
+        Lesson.objects.bulk_update(batch, ["content"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0006_search_vectors"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LessonContent",
+            fields=[
+                (
+                    "hash",
+                    models.CharField(max_length=64, primary_key=True, serialize=False),
+                ),
+                ("body", models.TextField()),
+                (
+                    "size",
+                    models.PositiveIntegerField(help_text="Size of the body in bytes."),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="lesson",
+            name="content_size",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="lesson",
+            name="content_blob",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="lessons",
+                to="courses.lessoncontent",
+            ),
+        ),
+        migrations.RunPython(move_content_to_store, move_content_to_lessons),
+        migrations.RemoveField(
+            model_name="lesson",
+            name="content",
+        ),
+    ]
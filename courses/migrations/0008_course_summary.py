@@ -0,0 +1,91 @@
+# Generated by Django 4.2 on 2026-10-17 04:25
+
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_per_course(queryset):
+    return Coalesce(
+        Subquery(
+            queryset.filter(course=OuterRef("pk"))
+            .order_by()
+            .values("course")
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def build_course_summaries(apps, schema_editor):
+    Course = apps.get_model("courses", "Course")
+    CourseSummary = apps.get_model("courses", "CourseSummary")
+    Lesson = apps.get_model("courses", "Lesson")
+    Enrollment = apps.get_model("enrollments", "Enrollment")
+
+    rows = Course.objects.filter(is_published=True).values(
+        "id",
+        "title",
+        "description",
+        "instructor_id",
+        "created_at",
+        "updated_at",
+        instructor_username=F("instructor__username"),
+        instructor_role=F("instructor__role"),
+        lessons_count=count_per_course(Lesson.objects.all()),
+        active_lessons_count=count_per_course(Lesson.objects.filter(is_active=True)),
+        enrollments_count=count_per_course(Enrollment.objects.all()),
+    )
+    CourseSummary.objects.bulk_create(
+        (
+            CourseSummary(
+                **row,
+                search_text="\n".join(
+                    [row["title"], row["description"], row["instructor_username"]]
+                ).lower(),
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0007_lesson_content_store"),
+        ("enrollments", "0005_enrollment_unique_constraint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CourseSummary",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("title", models.CharField(max_length=255)),
+                ("description", models.TextField()),
+                ("instructor_id", models.BigIntegerField()),
+                ("instructor_username", models.CharField(max_length=150)),
+                ("instructor_role", models.CharField(max_length=20)),
+                ("lessons_count", models.PositiveIntegerField(default=0)),
+                ("active_lessons_count", models.PositiveIntegerField(default=0)),
+                ("enrollments_count", models.PositiveIntegerField(default=0)),
+                (
+                    "search_text",
+                    models.TextField(
+                        help_text="Lowercased title, description and instructor username."
+                    ),
+                ),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="coursesummary",
+            index=models.Index(
+                fields=["created_at", "id"], name="coursesummary_created_id_idx"
+            ),
+        ),
+        migrations.RunPython(build_course_summaries, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,87 @@
-from django.db import models
+import hashlib
+from functools import partial
+
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models import Count, Exists, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
 from utils.models import BaseModel
 
 
+class CourseQuerySet(models.QuerySet):
+    def with_lessons_count(self):
+        lessons_count = (
+            Lesson.objects.filter(course=OuterRef("pk"))
+            .order_by()
+            .values("course")
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+        return self.annotate(lessons_count=Coalesce(Subquery(lessons_count), 0))
+
+    def with_is_enrolled(self, user):
+        from enrollments.models import Enrollment
+
+        return self.annotate(
+            is_enrolled=Exists(
+                Enrollment.objects.filter(course=OuterRef("pk"), user=user)
+            )
+        )
+
+    def with_enrollments_exist(self):
+        from enrollments.models import Enrollment
+
+        return self.annotate(
+            enrollments_exist=Exists(Enrollment.objects.filter(course=OuterRef("pk")))
+        )
+
+    def enrolled(self, user):
+        from enrollments.models import Enrollment
+
+        return self.filter(
+            Exists(Enrollment.objects.filter(course=OuterRef("pk"), user=user))
+        )
+
+
+class LessonQuerySet(models.QuerySet):
+    def mark_completed(self, user):
+        """
+        Mark every lesson of the queryset as completed by the user with a
+        single upsert and return a ``{lesson_id: status}`` mapping where
+        status is "completed" or "already_completed".
+        """
+        from enrollments.models import Enrollment, LessonProgress
+
+        lessons = dict(self.order_by().values_list("pk", "course_id"))
+        completed_ids = set(
+            LessonProgress.objects.filter(
+                user=user, lesson_id__in=lessons, completed=True
+            ).values_list("lesson_id", flat=True)
+        )
+        new_ids = [pk for pk in lessons if pk not in completed_ids]
+
+        if new_ids:
+            with transaction.atomic():
+                LessonProgress.objects.bulk_create(
+                    [
+                        LessonProgress(user=user, lesson_id=pk, completed=True)
+                        for pk in new_ids
+                    ],
+                    update_conflicts=True,
+                    unique_fields=["user", "lesson"],
+                    update_fields=["completed", "updated_at"],
+                )
+                Enrollment.objects.filter(
+                    user=user, course_id__in={lessons[pk] for pk in new_ids}
+                ).refresh_counters()
+
+        return {
+            pk: "already_completed" if pk in completed_ids else "completed"
+            for pk in lessons
+        }
+
+
 class Course(BaseModel):
     title = models.CharField(max_length=255, verbose_name="Course Title")
     description = models.TextField(verbose_name="Course Description")
@@ -13,13 +92,83 @@ class Course(BaseModel):
         verbose_name="Instructor",
     )
     is_published = models.BooleanField(default=False, verbose_name="Is Published")
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = CourseQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="course_created_at_id_idx"),
+            models.Index(
+                fields=["created_at", "id"],
+                condition=models.Q(is_published=True),
+                name="course_published_idx",
+            ),
+        ]
 
     def create_enrollment(self, user):
         from enrollments.models import Enrollment
 
-        enrollment = Enrollment.objects.create(course=self, user=user)
+        enrollment, created = Enrollment.objects.get_or_create(course=self, user=user)
+        if created:
+            Enrollment.objects.filter(pk=enrollment.pk).refresh_counters()
         return enrollment
 
+    def bulk_enroll(self, users, batch_size=1000):
+        """
+        Enroll many users at once and return a ``{user_id: status}`` mapping
+        where status is one of "enrolled", "already_enrolled", "not_student"
+        or "not_found". ``users`` may hold users or user ids.
+        """
+        from enrollments.models import Enrollment
+        from users.models import User
+
+        from .cache import invalidate_enrolled_course_ids
+        from .summary import refresh_course_summaries
+
+        user_ids = list(dict.fromkeys(getattr(user, "pk", user) for user in users))
+        roles = dict(User.objects.filter(pk__in=user_ids).values_list("pk", "role"))
+        student_ids = [pk for pk in user_ids if roles.get(pk) == User.Role.STUDENT]
+        enrolled_ids = set(
+            self.enrollments.filter(user_id__in=student_ids).values_list(
+                "user_id", flat=True
+            )
+        )
+        new_ids = [pk for pk in student_ids if pk not in enrolled_ids]
+
+        with transaction.atomic():
+            Enrollment.objects.bulk_create(
+                [Enrollment(course=self, user_id=pk) for pk in new_ids],
+                batch_size=batch_size,
+                ignore_conflicts=True,
+            )
+            Enrollment.objects.filter(
+                course=self, user_id__in=new_ids
+            ).refresh_counters()
+        # bulk_create does not send post_save, drop the cached sets by hand.
+        transaction.on_commit(partial(invalidate_enrolled_course_ids, *new_ids))
+        refresh_course_summaries(self.pk, invalidate_catalog=False)
+
+        results = {}
+        for pk in user_ids:
+            if pk not in roles:
+                results[pk] = "not_found"
+            elif roles[pk] != User.Role.STUDENT:
+                results[pk] = "not_student"
+            elif pk in enrolled_ids:
+                results[pk] = "already_enrolled"
+            else:
+                results[pk] = "enrolled"
+        return results
+
+    def refresh_enrollment_counters(self):
+        """
+        Recompute the progress counters of every enrollment in this course.
+        The Lesson signals call it when lessons are added, removed, moved or
+        (de)activated, bulk updates that skip them must call it by hand.
+        """
+        return self.enrollments.all().refresh_counters()
+
     def get_is_enrolled(self, user):
         """
         Check if a user is enrolled in this course.
@@ -33,11 +182,65 @@ class Course(BaseModel):
         return self.enrollments.exists()
 
 
+class LessonContent(models.Model):
+    """
+    Lesson bodies, kept out of the lesson rows. Each distinct body is stored
+    once, addressed by the SHA-256 of its UTF-8 encoding.
+    """
+
+    hash = models.CharField(max_length=64, primary_key=True)
+    body = models.TextField()
+    size = models.PositiveIntegerField(help_text="Size of the body in bytes.")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.hash
+
+    @staticmethod
+    def get_hash(data):
+        return hashlib.sha256(data).hexdigest()
+
+    @classmethod
+    def store(cls, body):
+        """
+        Row of ``body``, created when missing and locked until the end of the
+        transaction, so ``delete_orphans`` can not remove it before the lesson
+        points at it. Must run in a transaction.
+        """
+        data = body.encode()
+        # A row deleted by a concurrent delete_orphans is not found once its
+        # lock is released and is created again.
+        content, _ = cls.objects.select_for_update().get_or_create(
+            hash=cls.get_hash(data), defaults={"body": body, "size": len(data)}
+        )
+        return content
+
+    @classmethod
+    @transaction.atomic
+    def delete_orphans(cls, *hashes):
+        # Wait for the transactions that stored these bodies, then check for
+        # lessons with a fresh query that sees their commits.
+        locked = list(
+            cls.objects.select_for_update()
+            .filter(hash__in=hashes)
+            .values_list("hash", flat=True)
+        )
+        cls.objects.filter(hash__in=locked, lessons__isnull=True).delete()
+
+
 class Lesson(BaseModel):
     title = models.CharField(max_length=255, verbose_name="Lesson Title")
     description = models.TextField(verbose_name="Lesson Description")
     video_url = models.URLField(blank=True, null=True)
-    content = models.TextField(blank=True, null=True)
+    content_blob = models.ForeignKey(
+        LessonContent,
+        on_delete=models.PROTECT,
+        related_name="lessons",
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    content_size = models.PositiveIntegerField(default=0, editable=False)
     course = models.ForeignKey(
         Course,
         on_delete=models.CASCADE,
@@ -45,12 +248,133 @@ class Lesson(BaseModel):
         verbose_name="Course",
         null=True,
         blank=True,
+        # Covered by lesson_course_active_idx, which starts with the course.
+        db_index=False,
     )
     is_active = models.BooleanField(default=True, verbose_name="Is Active")
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = LessonQuerySet.as_manager()
 
     # TODO: validation for content ot URL exists, maybe just displaying not uploaded yet
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="lesson_created_at_id_idx"),
+            models.Index(
+                fields=["course", "is_active", "created_at"],
+                name="lesson_course_active_idx",
+            ),
+        ]
+
+    # Body assigned through ``content`` and not saved yet.
+    pending_content = None
+    has_pending_content = False
+    loaded_course_id = None
+    loaded_is_active = None
+
+    def __str__(self):
+        return self.title
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # State as stored in the database, lets signals detect moved and
+        # (de)activated lessons.
+        instance.loaded_course_id = instance.__dict__.get("course_id")
+        instance.loaded_is_active = instance.__dict__.get("is_active")
+        return instance
+
+    @property
+    def content(self):
+        if self.has_pending_content:
+            return self.pending_content
+        if self.content_blob_id is None:
+            return None
+        return self.content_blob.body
+
+    @content.setter
+    def content(self, value):
+        self.pending_content = value
+        self.has_pending_content = True
+
+    @property
+    def content_hash(self):
+        return self.content_blob_id
+
+    def save(self, *args, **kwargs):
+        if not self.has_pending_content:
+            return super().save(*args, **kwargs)
+
+        previous_hash = self.content_blob_id
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "content" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "content_blob", "content_size"}
+            kwargs["update_fields"].discard("content")
+        # The stored content row stays locked until the lesson points at it.
+        with transaction.atomic(using=kwargs.get("using")):
+            if self.pending_content:
+                self.content_blob = LessonContent.store(self.pending_content)
+                self.content_size = self.content_blob.size
+            else:
+                self.content_blob = None
+                self.content_size = 0
+            super().save(*args, **kwargs)
+        self.has_pending_content = False
+        self.pending_content = None
+        if previous_hash not in (None, self.content_blob_id):
+            LessonContent.delete_orphans(previous_hash)
+
+    def mark_completed(self, user):
+        """
+        Mark this lesson as completed by the user and bump the enrollment
+        counter the first time it happens.
+        """
+        from enrollments.models import Enrollment, LessonProgress
+
+        progress, created = LessonProgress.objects.get_or_create(
+            user=user, lesson=self, defaults={"completed": True}
+        )
+        if not created and progress.completed:
+            return progress
+        if not created:
+            progress.completed = True
+            progress.save(update_fields=["completed", "updated_at"])
+        if self.is_active:
+            Enrollment.objects.filter(user=user, course_id=self.course_id).update(
+                completed_lessons=F("completed_lessons") + 1
+            )
+        return progress
+
+
+class CourseSummary(models.Model):
+    """
+    Catalog read model, one denormalized row per published course kept up to
+    date by the signals in ``courses.signals``. ``id`` is the course id, so
+    summaries page and sort exactly like courses.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=255)
+    description = models.TextField()
+    instructor_id = models.BigIntegerField()
+    instructor_username = models.CharField(max_length=150)
+    instructor_role = models.CharField(max_length=20)
+    lessons_count = models.PositiveIntegerField(default=0)
+    active_lessons_count = models.PositiveIntegerField(default=0)
+    enrollments_count = models.PositiveIntegerField(default=0)
+    search_text = models.TextField(
+        help_text="Lowercased title, description and instructor username."
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"], name="coursesummary_created_id_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.title
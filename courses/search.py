@@ -0,0 +1,208 @@
+"""
+Full text search over courses and lessons.
+
+The backend is picked from ``settings.COURSE_SEARCH_BACKEND`` or, when it is
+not set, from the database vendor: Postgres uses the ``search_vector``
+columns with GIN indexes, SQLite uses FTS5 tables and everything else falls
+back to DRF's ``icontains`` search. Indexes are kept in sync by the signals
+in ``courses.signals``.
+"""
+
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, FloatField, OuterRef, Q, Subquery, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from rest_framework import filters
+
+from .models import Course, Lesson
+
+User = get_user_model()
+
+
+class BaseSearchBackend(ABC):
+    @abstractmethod
+    def search(self, queryset, terms, search_fields):
+        """
+        Filter the queryset down to rows matching all terms, ranked by
+        relevance in a ``search_rank`` annotation.
+        """
+
+    def index_courses(self, courses):
+        """
+        (Re)index the given course queryset and the lessons of those courses.
+        """
+
+    def index_lessons(self, lessons):
+        """
+        (Re)index the given lesson queryset.
+        """
+
+    def remove(self, instance):
+        """
+        Drop a deleted course or lesson from the index.
+        """
+
+    def rebuild(self):
+        self.index_courses(Course.objects.all())
+        self.index_lessons(Lesson.objects.filter(course__isnull=True))
+
+
+class DefaultSearchBackend(BaseSearchBackend):
+    """
+    Unindexed ``icontains`` search across the view's search fields.
+    """
+
+    def search(self, queryset, terms, search_fields):
+        for term in terms:
+            condition = Q()
+            for field in search_fields:
+                condition |= Q(**{f"{field}__icontains": term})
+            queryset = queryset.filter(condition)
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    def get_course_vector(self):
+        instructor = User.objects.filter(pk=OuterRef("instructor_id")).values(
+            "username"
+        )
+        return (
+            SearchVector("title", weight="A")
+            + SearchVector("description", weight="B")
+            + SearchVector(Subquery(instructor), weight="C")
+        )
+
+    def get_lesson_vector(self):
+        course = Course.objects.filter(pk=OuterRef("course_id"))
+        return (
+            SearchVector("title", weight="A")
+            + SearchVector("description", weight="B")
+            + SearchVector(Subquery(course.values("title")), weight="C")
+            + SearchVector(Subquery(course.values("description")), weight="D")
+        )
+
+    def search(self, queryset, terms, search_fields):
+        query = SearchQuery(" ".join(terms), search_type="websearch")
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(search_rank=SearchRank(F("search_vector"), query))
+            .order_by("-search_rank", "pk")
+        )
+
+    def index_courses(self, courses):
+        courses.update(search_vector=self.get_course_vector())
+        self.index_lessons(Lesson.objects.filter(course__in=courses.values("pk")))
+
+    def index_lessons(self, lessons):
+        lessons.update(search_vector=self.get_lesson_vector())
+
+
+class SqliteSearchBackend(BaseSearchBackend):
+    course_table = "courses_course_fts"
+    lesson_table = "courses_lesson_fts"
+    # bm25() column weights, mirroring the A/B/C/D weights used on Postgres.
+    course_weights = "10.0, 2.0, 1.0"
+    lesson_weights = "10.0, 2.0, 1.0, 0.5"
+
+    def get_table(self, model):
+        return self.course_table if model is Course else self.lesson_table
+
+    def get_weights(self, model):
+        return self.course_weights if model is Course else self.lesson_weights
+
+    def get_match_query(self, terms):
+        # Quote every term so user input can not inject FTS5 syntax.
+        return " ".join('"%s"*' % term.replace('"', '""') for term in terms)
+
+    def search(self, queryset, terms, search_fields):
+        table = self.get_table(queryset.model)
+        weights = self.get_weights(queryset.model)
+        match = self.get_match_query(terms)
+        quote_name = connection.ops.quote_name
+        opts = queryset.model._meta
+        pk_column = f"{quote_name(opts.db_table)}.{quote_name(opts.pk.column)}"
+        matches = RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [match])
+        rank = RawSQL(
+            f"SELECT -bm25({table}, {weights}) FROM {table} "
+            f"WHERE {table} MATCH %s AND rowid = {pk_column}",
+            [match],
+            output_field=FloatField(),
+        )
+        return (
+            queryset.filter(pk__in=matches)
+            .annotate(search_rank=rank)
+            .order_by("-search_rank", "pk")
+        )
+
+    def execute(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+    def index_courses(self, courses):
+        ids_sql, params = courses.values("pk").query.sql_with_params()
+        self.execute(
+            f"DELETE FROM {self.course_table} WHERE rowid IN ({ids_sql})", params
+        )
+        self.execute(
+            f"INSERT INTO {self.course_table} (rowid, title, description, instructor) "
+            "SELECT c.id, c.title, c.description, u.username "
+            "FROM courses_course c JOIN users_user u ON u.id = c.instructor_id "
+            f"WHERE c.id IN ({ids_sql})",
+            params,
+        )
+        self.index_lessons(Lesson.objects.filter(course__in=courses.values("pk")))
+
+    def index_lessons(self, lessons):
+        ids_sql, params = lessons.values("pk").query.sql_with_params()
+        self.execute(
+            f"DELETE FROM {self.lesson_table} WHERE rowid IN ({ids_sql})", params
+        )
+        self.execute(
+            f"INSERT INTO {self.lesson_table} "
+            "(rowid, title, description, course_title, course_description) "
+            "SELECT l.id, l.title, l.description, c.title, c.description "
+            "FROM courses_lesson l LEFT JOIN courses_course c ON c.id = l.course_id "
+            f"WHERE l.id IN ({ids_sql})",
+            params,
+        )
+
+    def remove(self, instance):
+        table = self.get_table(type(instance))
+        self.execute(f"DELETE FROM {table} WHERE rowid = %s", [instance.pk])
+
+    def rebuild(self):
+        self.execute(f"DELETE FROM {self.course_table}", [])
+        self.execute(f"DELETE FROM {self.lesson_table}", [])
+        super().rebuild()
+
+
+VENDOR_BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SqliteSearchBackend,
+}
+
+
+def get_search_backend():
+    backend_path = getattr(settings, "COURSE_SEARCH_BACKEND", None)
+    if backend_path:
+        return import_string(backend_path)()
+    return VENDOR_BACKENDS.get(connection.vendor, DefaultSearchBackend)()
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    ``SearchFilter`` that runs the query through the configured full text
+    search backend and orders the results by relevance.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or not search_terms:
+            return queryset
+        return get_search_backend().search(queryset, search_terms, search_fields)
@@ -1,8 +1,11 @@
+from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.exceptions import PermissionDenied
 
 from courses.models import Course, Lesson
+from courses.summary import refresh_course_summaries
 from users.serializers import UserSerializer
+from utils.serializers import ValuesSerializer
 
 
 class CourseLessonCreateUpdateSerializer(serializers.Serializer):
@@ -15,7 +18,32 @@ class CourseLessonCreateUpdateSerializer(serializers.Serializer):
     is_active = serializers.BooleanField()
 
 
+class LessonStubSerializer(serializers.ModelSerializer):
+    """
+    Lesson without its body, lists only carry the hash and size of the
+    content. The body is served by the lesson ``content`` endpoint.
+    """
+
+    content_hash = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = Lesson
+        fields = (
+            "id",
+            "title",
+            "course",
+            "description",
+            "video_url",
+            "content_hash",
+            "content_size",
+            "is_active",
+        )
+
+
 class LessonSerializer(serializers.ModelSerializer):
+    content = serializers.CharField(required=False, allow_null=True, allow_blank=True)
+    content_hash = serializers.CharField(read_only=True)
+
     class Meta:
         model = Lesson
         fields = (
@@ -25,6 +53,8 @@ class LessonSerializer(serializers.ModelSerializer):
             "description",
             "video_url",
             "content",
+            "content_hash",
+            "content_size",
             "is_active",
         )
 
@@ -97,8 +127,13 @@ class CourseDetailSerializer(serializers.ModelSerializer):
 
     def to_representation(self, instance):
         rep = super().to_representation(instance)
-        lessons = instance.lessons.filter(is_active=True)
-        rep["lessons"] = LessonSerializer(instance=lessons, many=True).data
+        if "lessons" not in self.fields:
+            # Pruned by a sparse fieldset.
+            return rep
+        lessons = getattr(instance, "active_lessons", None)
+        if lessons is None:
+            lessons = instance.lessons.filter(is_active=True)
+        rep["lessons"] = LessonStubSerializer(instance=lessons, many=True).data
         return rep
 
     def validate(self, attrs):
@@ -118,6 +153,7 @@ class CourseDetailSerializer(serializers.ModelSerializer):
 
         lesson_mapping = {lesson.id: lesson for lesson in instance.lessons.all()}
         updated_lessons = []
+        now = timezone.now()
 
         for lesson_data in lessons_data:
             lesson_id = lesson_data.get("id")
@@ -125,9 +161,77 @@ class CourseDetailSerializer(serializers.ModelSerializer):
                 lesson = lesson_mapping[lesson_id]
                 for attr, value in lesson_data.items():
                     setattr(lesson, attr, value)
+                lesson.updated_at = now
                 updated_lessons.append(lesson)
 
         if updated_lessons:
-            Lesson.objects.bulk_update(updated_lessons, ["is_active"])
+            Lesson.objects.bulk_update(updated_lessons, ["is_active", "updated_at"])
+            instance.refresh_enrollment_counters()
+            refresh_course_summaries(instance.pk)
+            # The prefetched active lessons are stale now.
+            instance.__dict__.pop("active_lessons", None)
 
         return instance
+
+
+class LessonValuesSerializer(ValuesSerializer):
+    """
+    ``LessonStubSerializer`` output for list responses, rendered from
+    ``values()``.
+    """
+
+    fields = {
+        "id": "id",
+        "title": "title",
+        "course": "course",
+        "description": "description",
+        "video_url": "video_url",
+        "content_hash": "content_blob",
+        "content_size": "content_size",
+        "is_active": "is_active",
+    }
+
+
+class CourseValuesSerializer(ValuesSerializer):
+    """
+    ``CourseSerializer`` output for list responses. The instructor is joined
+    in the same query instead of being loaded per row.
+    """
+
+    fields = {
+        "id": "id",
+        "title": "title",
+        "description": "description",
+        "instructor": {
+            "id": "instructor_id",
+            "username": "instructor__username",
+            "role": "instructor__role",
+        },
+        "is_published": "is_published",
+        "lessons_count": "lessons_count",
+        "is_enrolled": "is_enrolled",
+    }
+    defaults = {"is_enrolled": False}
+
+
+class CourseSummaryValuesSerializer(ValuesSerializer):
+    """
+    ``CourseSerializer`` output of catalog pages, rendered from
+    ``CourseSummary`` rows without any join.
+    """
+
+    fields = {
+        "id": "id",
+        "title": "title",
+        "description": "description",
+        "instructor": {
+            "id": "instructor_id",
+            "username": "instructor_username",
+            "role": "instructor_role",
+        },
+        "is_published": "is_published",
+        "lessons_count": "lessons_count",
+        "is_enrolled": "is_enrolled",
+    }
+    # Only published courses have a summary.
+    defaults = {"is_published": True, "is_enrolled": False}
@@ -0,0 +1,114 @@
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from enrollments.models import DailyLessonCompletionRollup, Enrollment
+
+from .cache import invalidate_enrolled_course_ids
+from .models import Course, Lesson, LessonContent
+from .search import get_search_backend
+from .summary import refresh_course_summaries
+
+
+def is_instructor_profile_change(instance, created, update_fields):
+    # Logins only touch last_login, everything else may rename the instructor.
+    if created or not instance.is_instructor:
+        return False
+    return update_fields is None or not set(update_fields) <= {"last_login"}
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def invalidate_enrolled_courses(sender, instance, **kwargs):
+    # After commit, a read in between would cache the set without the change.
+    transaction.on_commit(partial(invalidate_enrolled_course_ids, instance.user_id))
+
+
+@receiver(post_save, sender=Course)
+def index_course(sender, instance, **kwargs):
+    get_search_backend().index_courses(Course.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Lesson)
+def index_lesson(sender, instance, **kwargs):
+    get_search_backend().index_lessons(Lesson.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=Lesson)
+def remove_from_search_index(sender, instance, **kwargs):
+    get_search_backend().remove(instance)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def reindex_instructor_courses(sender, instance, created, update_fields, **kwargs):
+    if is_instructor_profile_change(instance, created, update_fields):
+        get_search_backend().index_courses(instance.courses.all())
+
+
+@receiver(post_delete, sender=Lesson)
+def delete_orphaned_content(sender, instance, **kwargs):
+    if instance.content_blob_id is not None:
+        LessonContent.delete_orphans(instance.content_blob_id)
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def refresh_course_summary(sender, instance, **kwargs):
+    refresh_course_summaries(instance.pk)
+
+
+@receiver(post_save, sender=Lesson)
+def refresh_lesson_enrollment_counters(sender, instance, created, **kwargs):
+    course_ids = {instance.course_id}
+    if not created:
+        if instance.loaded_course_id != instance.course_id:
+            course_ids.add(instance.loaded_course_id)
+        elif instance.loaded_is_active == instance.is_active:
+            return
+    Enrollment.objects.filter(course_id__in=course_ids - {None}).refresh_counters()
+
+
+@receiver(post_delete, sender=Lesson)
+def refresh_deleted_lesson_enrollment_counters(sender, instance, **kwargs):
+    if instance.course_id is not None:
+        Enrollment.objects.filter(course_id=instance.course_id).refresh_counters()
+
+
+@receiver(post_save, sender=Lesson)
+def move_lesson_completion_rollups(sender, instance, **kwargs):
+    if instance.loaded_course_id not in (None, instance.course_id):
+        DailyLessonCompletionRollup.objects.filter(lesson=instance).update(
+            course_id=instance.course_id
+        )
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def refresh_lesson_course_summaries(sender, instance, **kwargs):
+    refresh_course_summaries(instance.course_id, instance.loaded_course_id)
+
+
+@receiver(post_save, sender=Lesson)
+def remember_loaded_lesson_state(sender, instance, **kwargs):
+    # Connected after every receiver comparing against the loaded state.
+    instance.loaded_course_id = instance.course_id
+    instance.loaded_is_active = instance.is_active
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def refresh_enrollment_course_summary(sender, instance, **kwargs):
+    # Enrollment counts are not rendered by the catalog.
+    refresh_course_summaries(instance.course_id, invalidate_catalog=False)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def refresh_instructor_course_summaries(
+    sender, instance, created, update_fields, **kwargs
+):
+    if is_instructor_profile_change(instance, created, update_fields):
+        refresh_course_summaries(*instance.courses.values_list("pk", flat=True))
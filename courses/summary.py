@@ -0,0 +1,127 @@
+"""
+Maintenance of the ``CourseSummary`` catalog read model.
+
+Summaries are refreshed per course from the signals in ``courses.signals``
+and from the bulk code paths that bypass them. A refresh runs once the
+writing transaction has committed and recomputes the affected rows while
+holding their course rows locked. Concurrent refreshes of a course are
+serialized, and the last one reads every committed write. The catalog cache
+version is bumped once the refreshed summaries are committed.
+``rebuild_course_summaries`` rebuilds the whole table.
+"""
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .cache import bump_catalog_version
+from .models import Course, CourseSummary, Lesson
+
+SUMMARY_UPDATE_FIELDS = [
+    field.name for field in CourseSummary._meta.concrete_fields if not field.primary_key
+]
+
+
+def count_per_course(queryset):
+    return Coalesce(
+        Subquery(
+            queryset.filter(course=OuterRef("pk"))
+            .order_by()
+            .values("course")
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def build_summaries(courses):
+    """
+    Unsaved summaries of the published courses of ``courses``.
+    """
+    from enrollments.models import Enrollment
+
+    rows = courses.filter(is_published=True).values(
+        "id",
+        "title",
+        "description",
+        "instructor_id",
+        "created_at",
+        "updated_at",
+        instructor_username=F("instructor__username"),
+        instructor_role=F("instructor__role"),
+        lessons_count=count_per_course(Lesson.objects.all()),
+        active_lessons_count=count_per_course(Lesson.objects.filter(is_active=True)),
+        enrollments_count=count_per_course(Enrollment.objects.all()),
+    )
+    return [
+        CourseSummary(
+            **row,
+            search_text="\n".join(
+                [row["title"], row["description"], row["instructor_username"]]
+            ).lower(),
+        )
+        for row in rows
+    ]
+
+
+def refresh_course_summaries(*course_ids, invalidate_catalog=True):
+    """
+    Recompute the summaries of the courses after the current transaction
+    commits. A count computed inside the writer's transaction could miss a
+    concurrent write to the same course and stay wrong. Pass
+    ``invalidate_catalog=False`` when nothing the catalog renders changed.
+    """
+    course_ids = {pk for pk in course_ids if pk is not None}
+    if course_ids:
+        transaction.on_commit(
+            partial(write_course_summaries, course_ids, invalidate_catalog)
+        )
+
+
+@transaction.atomic
+def write_course_summaries(course_ids, invalidate_catalog=True):
+    # Serializes refreshes of a course. The lock is taken before counting,
+    # so the last refresh sees every write committed before it started.
+    list(
+        Course.objects.select_for_update()
+        .filter(pk__in=course_ids)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    summaries = build_summaries(Course.objects.filter(pk__in=course_ids))
+    CourseSummary.objects.filter(pk__in=course_ids).exclude(
+        pk__in=[summary.pk for summary in summaries]
+    ).delete()
+    CourseSummary.objects.bulk_create(
+        summaries,
+        update_conflicts=True,
+        unique_fields=["id"],
+        update_fields=SUMMARY_UPDATE_FIELDS,
+    )
+    if invalidate_catalog:
+        # Catalog pages read the summaries, a page cached before this commit
+        # must not be served after it.
+        transaction.on_commit(bump_catalog_version)
+
+
+@transaction.atomic
+def rebuild_course_summaries(batch_size=1000):
+    """
+    Rebuild every summary from scratch and return how many were written.
+    """
+    CourseSummary.objects.all().delete()
+    course_ids = list(
+        Course.objects.filter(is_published=True)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    for start in range(0, len(course_ids), batch_size):
+        batch = course_ids[start : start + batch_size]
+        CourseSummary.objects.bulk_create(
+            build_summaries(Course.objects.filter(pk__in=batch))
+        )
+    transaction.on_commit(bump_catalog_version)
+    return len(course_ids)
@@ -1,3 +1,1117 @@
-from django.test import TestCase
+import json
+import tempfile
+import threading
+import time
+from contextlib import ExitStack
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TransactionTestCase, override_settings, skipUnlessDBFeature, tag
+from django.test.utils import CaptureQueriesContext
+from rest_framework.pagination import Cursor
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from enrollments.models import Enrollment, LessonProgress
+from users.cache import user_cache
+from users.models import User
+from utils.pagination import KeysetPagination, LimitOffsetPagination
+
+from .cache import get_enrolled_course_ids
+from .models import Course, CourseSummary, Lesson, LessonContent
+from .search import BaseSearchBackend
+from .views import CourseModelViewSet, LessonViewSet
+
+
+class CourseTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.instructor = User.objects.create_user(
+            "instructor", password="password", role=User.Role.INSTRUCTOR
+        )
+        self.student = User.objects.create_user(
+            "student", password="password", role=User.Role.STUDENT
+        )
+
+    def create_course(self, lessons=1, **kwargs):
+        kwargs.setdefault("title", "Course")
+        kwargs.setdefault("description", "Description")
+        kwargs.setdefault("is_published", True)
+        # Course summaries are refreshed on commit.
+        with self.captureOnCommitCallbacks(execute=True):
+            course = Course.objects.create(instructor=self.instructor, **kwargs)
+            for index in range(lessons):
+                Lesson.objects.create(
+                    title=f"Lesson {index}", description="Description", course=course
+                )
+        return course
+
+    def enroll_students(self, courses, count):
+        """
+        Enroll ``count`` new students in every course with bulk inserts.
+        """
+        offset = User.objects.count()
+        students = User.objects.bulk_create(
+            User(username=f"bulk-{offset + index}", role=User.Role.STUDENT)
+            for index in range(count)
+        )
+        Enrollment.objects.bulk_create(
+            Enrollment(user=student, course=course)
+            for course in courses
+            for student in students
+        )
+
+
+def best_of(function, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+class CatalogCacheTests(CourseTestCase):
+    def test_page_built_before_a_version_bump_is_not_served_after_it(self):
+        self.create_course()
+        list_values = CourseModelViewSet.list_values
+
+        def list_values_and_publish(view, queryset, serializer):
+            response = list_values(view, queryset, serializer)
+            # Published while the page was being built, bumps the version.
+            self.create_course(title="Concurrent")
+            return response
+
+        # The publish queries run inside the request, off its budget.
+        with mock.patch.object(
+            CourseModelViewSet, "list_values", list_values_and_publish
+        ), override_settings(QUERY_BUDGET_ENFORCE=False):
+            response = self.client.get("/api/v1/courses/")
+        self.assertEqual(response.json()["count"], 1)
+
+        response = self.client.get("/api/v1/courses/")
+        self.assertEqual(response.json()["count"], 2)
+
+    def test_page_read_before_the_writer_commits_is_not_served_after_it(self):
+        course = self.create_course(lessons=1)
+
+        def lessons_count():
+            (row,) = self.client.get("/api/v1/courses/").json()["results"]
+            return row["lessons_count"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Lesson.objects.create(
+                title="Lesson", description="Description", course=course
+            )
+            # Read by another request while the writer has not committed.
+            self.assertEqual(lessons_count(), 1)
+        self.assertEqual(CourseSummary.objects.get().lessons_count, 2)
+        self.assertEqual(lessons_count(), 2)
+
+    def test_catalog_page_is_served_from_the_cache(self):
+        self.create_course()
+        self.client.get("/api/v1/courses/")
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/v1/courses/")
+        self.assertEqual(response.json()["count"], 1)
+
+
+class EnrollmentCounterTests(CourseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.course = self.create_course(lessons=5)
+        self.course.create_enrollment(self.student)
+        self.client.force_authenticate(self.instructor)
+
+    def get_progress(self):
+        response = self.client.get(
+            f"/api/v1/courses/{self.course.pk}/get_progress/",
+            {"user_id": self.student.pk},
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_counters_follow_lessons_changed_through_the_orm(self):
+        lesson = self.course.lessons.first()
+        lesson.mark_completed(self.student)
+        for index in range(20):
+            Lesson.objects.create(
+                title=f"Extra {index}", description="Description", course=self.course
+            )
+        self.assertEqual(self.get_progress()["lessons_count"], 25)
+
+        lesson.is_active = False
+        lesson.save()
+        progress = self.get_progress()
+        self.assertEqual(progress["lessons_count"], 24)
+        self.assertEqual(progress["completed_lessons"], 0)
+
+        lesson.is_active = True
+        lesson.save()
+        self.assertEqual(self.get_progress()["completed_lessons"], 1)
+
+        other = self.create_course(lessons=0, title="Other")
+        lesson.course = other
+        lesson.save()
+        self.assertEqual(self.get_progress()["lessons_count"], 24)
+
+        self.course.lessons.first().delete()
+        self.assertEqual(self.get_progress()["lessons_count"], 23)
+
+
+class BulkEnrollTests(CourseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.course = self.create_course(lessons=3)
+        self.course.create_enrollment(self.student)
+        self.new_students = [
+            User.objects.create_user(f"new{index}", role=User.Role.STUDENT)
+            for index in range(2)
+        ]
+        self.url = f"/api/v1/courses/{self.course.pk}/bulk-enroll/"
+
+    def test_statuses(self):
+        first, second = self.new_students
+        with self.captureOnCommitCallbacks(execute=True):
+            results = self.course.bulk_enroll(
+                [self.student, first.pk, second, self.instructor.pk, 0, first]
+            )
+        self.assertEqual(
+            list(results.items()),
+            [
+                (self.student.pk, "already_enrolled"),
+                (first.pk, "enrolled"),
+                (second.pk, "enrolled"),
+                (self.instructor.pk, "not_student"),
+                (0, "not_found"),
+            ],
+        )
+        self.assertEqual(
+            set(self.course.enrollments.values_list("user_id", flat=True)),
+            {self.student.pk, first.pk, second.pk},
+        )
+
+    def test_counters_summary_and_cached_sets_are_updated(self):
+        first, second = self.new_students
+        self.assertEqual(get_enrolled_course_ids(first), set())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.bulk_enroll([first, second])
+
+        for enrollment in self.course.enrollments.filter(user__in=self.new_students):
+            self.assertEqual(enrollment.active_lessons, 3)
+            self.assertEqual(enrollment.completed_lessons, 0)
+        summary = CourseSummary.objects.get(pk=self.course.pk)
+        self.assertEqual(summary.enrollments_count, 3)
+        self.assertEqual(get_enrolled_course_ids(first), {self.course.pk})
+
+    def post(self, data, content_type):
+        self.client.force_authenticate(self.instructor)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, data, content_type=content_type)
+        return response
+
+    def test_bodies(self):
+        first, second = self.new_students
+        expected = {
+            "results": [
+                {"user_id": first.pk, "status": "enrolled"},
+                {"user_id": self.student.pk, "status": "already_enrolled"},
+                {"user_id": self.instructor.pk, "status": "not_student"},
+                {"user_id": 0, "status": "not_found"},
+            ]
+        }
+        ids = [first.pk, self.student.pk, self.instructor.pk, 0]
+        bodies = {
+            "text/csv": "user_id,email\n"
+            + "".join(f"{pk},{pk}@example.com\n" for pk in ids),
+            "application/x-ndjson": "\n".join(
+                json.dumps({"user_id": pk}) for pk in ids
+            ),
+            "application/json": json.dumps({"user_ids": ids}),
+        }
+        for content_type, body in bodies.items():
+            with self.subTest(content_type=content_type):
+                response = self.post(body, content_type)
+                self.assertEqual(response.status_code, 200, response.content)
+                self.assertEqual(response.json(), expected)
+                Enrollment.objects.filter(user=first).delete()
+
+        response = self.post(json.dumps([second.pk]), "application/json")
+        self.assertEqual(
+            response.json(),
+            {"results": [{"user_id": second.pk, "status": "enrolled"}]},
+        )
+
+    def test_invalid_rows(self):
+        for body, content_type in [
+            ("name\nfoo\n", "text/csv"),
+            ('{"user_id": "one"}', "application/x-ndjson"),
+            ("{not json", "application/x-ndjson"),
+        ]:
+            with self.subTest(body=body):
+                self.assertEqual(self.post(body, content_type).status_code, 400)
+
+    def test_students_can_not_bulk_enroll(self):
+        self.client.force_authenticate(self.student)
+        response = self.client.post(self.url, {"user_ids": []}, format="json")
+        self.assertEqual(response.status_code, 403)
+
+
+class CourseSummaryTests(CourseTestCase):
+    def test_summary_is_refreshed_after_commit(self):
+        course = self.create_course(lessons=2)
+        with self.captureOnCommitCallbacks() as callbacks:
+            course.create_enrollment(self.student)
+            Lesson.objects.create(
+                title="Inactive", description="Description", course=course
+            )
+            Lesson.objects.filter(title="Inactive").get().delete()
+        summary = CourseSummary.objects.get(pk=course.pk)
+        self.assertEqual((summary.lessons_count, summary.enrollments_count), (2, 0))
+
+        for callback in callbacks:
+            callback()
+        summary.refresh_from_db()
+        self.assertEqual((summary.lessons_count, summary.enrollments_count), (2, 1))
+
+    def test_unpublished_course_has_no_summary(self):
+        course = self.create_course()
+        with self.captureOnCommitCallbacks(execute=True):
+            course.is_published = False
+            course.save()
+        self.assertFalse(CourseSummary.objects.filter(pk=course.pk).exists())
+
+
+class ConditionalTests(CourseTestCase):
+    def test_validated_responses_must_be_revalidated(self):
+        self.create_course()
+        self.client.force_authenticate(self.instructor)
+        response = self.client.get("/api/v1/courses/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+        self.assertIn("Last-Modified", response)
+
+        response = self.client.get(
+            "/api/v1/courses/", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+
+
+class EnrollmentAnnotationTests(CourseTestCase):
+    url = "/api/v1/courses/?enrolled=false"
+
+    def setUp(self):
+        super().setUp()
+        self.courses = [self.create_course(lessons=3, title=f"C{i}") for i in range(3)]
+        self.courses[1].create_enrollment(self.student)
+        self.client.force_authenticate(self.student)
+
+    def list_courses(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.json(), queries
+
+    def test_is_enrolled_does_not_multiply_rows(self):
+        self.enroll_students(self.courses, 20)
+        data, queries = self.list_courses()
+        self.assertEqual(data["count"], 3)
+        self.assertEqual(
+            [(course["id"], course["lessons_count"]) for course in data["results"]],
+            [(course.pk, 3) for course in self.courses],
+        )
+        self.assertEqual(
+            [course["is_enrolled"] for course in data["results"]], [False, True, False]
+        )
+        (page_sql,) = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith('SELECT "courses_course"."id"')
+        ]
+        self.assertIn("EXISTS", page_sql)
+        self.assertNotIn('JOIN "enrollments_enrollment"', page_sql)
+
+    def test_query_count_does_not_depend_on_enrollments(self):
+        _, queries = self.list_courses()
+        self.enroll_students(self.courses, 20)
+        with self.assertNumQueries(len(queries)):
+            self.list_courses()
+
+    @tag("benchmark")
+    def test_benchmark_list_with_10k_enrollments_per_course(self):
+        self.enroll_students(self.courses, 10_000)
+        _, queries = self.list_courses()
+        seconds = best_of(self.list_courses)
+        print(
+            f"\ncourse list, 3 courses x 10k enrollments: {seconds * 1000:.1f} ms, "
+            f"{len(queries)} queries"
+        )
+        self.assertEqual(len(queries), 4)
+
+
+class CourseDetailTests(CourseTestCase):
+    def retrieve(self, course):
+        cache.clear()
+        return self.client.get(f"/api/v1/courses/{course.pk}/")
+
+    def test_query_count_does_not_depend_on_lessons(self):
+        small = self.create_course(lessons=1, title="Small")
+        large = self.create_course(lessons=25, title="Large")
+        for course in (small, large):
+            course.create_enrollment(self.student)
+        self.client.force_authenticate(self.student)
+
+        for course, lessons in ((small, 1), (large, 25)):
+            with self.subTest(lessons=lessons), self.assertNumQueries(4):
+                response = self.retrieve(course)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()["lessons"]), lessons)
+
+
+class SparseFieldsetTests(CourseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.course = self.create_course(lessons=2)
+        self.lesson = self.course.lessons.first()
+        self.client.force_authenticate(self.instructor)
+
+    def get_sql(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json(), "\n".join(query["sql"] for query in queries)
+
+    def test_unrequested_columns_are_not_selected(self):
+        cases = [
+            ("/api/v1/courses/", '"courses_course"."description"'),
+            (f"/api/v1/courses/{self.course.pk}/", '"courses_course"."description"'),
+            ("/api/v1/courses/lessons/", '"courses_lesson"."description"'),
+            (
+                f"/api/v1/courses/lessons/{self.lesson.pk}/",
+                '"courses_lesson"."video_url"',
+            ),
+        ]
+        for url, column in cases:
+            with self.subTest(url=url):
+                _, sql = self.get_sql(url)
+                self.assertIn(column, sql)
+                data, sql = self.get_sql(f"{url}?fields=id,title")
+                self.assertNotIn(column, sql)
+                rows = data["results"] if "results" in data else [data]
+                self.assertEqual(set(rows[0]), {"id", "title"})
+
+    def test_omitted_columns_are_not_selected(self):
+        data, sql = self.get_sql("/api/v1/courses/?omit=description")
+        self.assertNotIn('"courses_course"."description"', sql)
+        self.assertNotIn("description", data["results"][0])
+
+    def test_unknown_field_is_rejected(self):
+        for param in ("fields", "omit"):
+            with self.subTest(param=param):
+                response = self.client.get(f"/api/v1/courses/?{param}=id,price")
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(
+                    response.json(), {"fields": "Unknown field(s): price."}
+                )
+
+    @tag("benchmark")
+    def test_benchmark_sparse_list(self):
+        Course.objects.bulk_create(
+            Course(
+                title=f"Bulk {index}",
+                description="Description " * 2000,
+                instructor=self.instructor,
+            )
+            for index in range(200)
+        )
+        timings = []
+        for url in (
+            "/api/v1/courses/?limit=200",
+            "/api/v1/courses/?limit=200&fields=id,title",
+        ):
+            size = len(self.client.get(url).content)
+            seconds = best_of(lambda: self.client.get(url))
+            timings.append(f"{url}: {seconds * 1000:.1f} ms, {size // 1024} KiB")
+        print("\ncourse list, 200 rows with 24 KB descriptions\n" + "\n".join(timings))
+
+
+class ProgressTests(CourseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.course = self.create_course(lessons=4)
+        self.lessons = list(self.course.lessons.order_by("pk"))
+        self.other = User.objects.create_user(
+            "other", password="password", role=User.Role.STUDENT
+        )
+        for student in (self.student, self.other):
+            self.course.create_enrollment(student)
+        self.lessons[0].mark_completed(self.student)
+
+    def get_progress(self):
+        """
+        Completed lessons of the student from the single, bulk and own
+        progress endpoints.
+        """
+        url = f"/api/v1/courses/{self.course.pk}"
+        self.client.force_authenticate(self.instructor)
+        single = self.get_json(f"{url}/get_progress/?user_id={self.student.pk}")
+        bulk = self.get_json(f"{url}/progress/")
+        self.client.force_authenticate(self.student)
+        (own,) = self.get_json("/api/v1/courses/my-progress/")
+        return (
+            single["completed_lessons"],
+            {row["user_id"]: row["completed_lessons"] for row in bulk},
+            own["completed_lessons"],
+        )
+
+    def get_json(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        if response.streaming:
+            return json.loads(b"".join(response.streaming_content))
+        return response.json()
+
+    def test_progress_is_streamed(self):
+        self.client.force_authenticate(self.instructor)
+        response = self.client.get(f"/api/v1/courses/{self.course.pk}/progress/")
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            json.loads(b"".join(response.streaming_content)),
+            [
+                {
+                    "user_id": self.student.pk,
+                    "progress": 25.0,
+                    "completed_lessons": 1,
+                    "lessons_count": 4,
+                },
+                {
+                    "user_id": self.other.pk,
+                    "progress": 0,
+                    "completed_lessons": 0,
+                    "lessons_count": 4,
+                },
+            ],
+        )
+        response = self.client.get(
+            f"/api/v1/courses/{self.course.pk}/progress/?user_ids=0"
+        )
+        self.assertEqual(b"".join(response.streaming_content), b"[]")
+
+    def test_endpoints_agree_on_queued_completions(self):
+        self.assertEqual(
+            self.get_progress(), (1, {self.student.pk: 1, self.other.pk: 0}, 1)
+        )
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            LESSON_PROGRESS_WRITE_BEHIND=True,
+            LESSON_PROGRESS_QUEUE_PATH=f"{directory}/queue.sqlite3",
+        ):
+            self.client.force_authenticate(self.student)
+            response = self.client.post(
+                "/api/v1/courses/lessons/mark-as-completed/",
+                # Already completed, queued twice and queued lessons count once.
+                {"lesson_ids": [lesson.pk for lesson in self.lessons[:3]] * 2},
+                format="json",
+            )
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(
+                self.get_progress(), (3, {self.student.pk: 3, self.other.pk: 0}, 3)
+            )
+
+
+class BulkCompletionTests(CourseTestCase):
+    url = "/api/v1/courses/lessons/mark-as-completed/"
+
+    def setUp(self):
+        super().setUp()
+        self.course = self.create_course(lessons=3)
+        self.lessons = list(self.course.lessons.order_by("pk"))
+        self.enrollment = self.course.create_enrollment(self.student)
+        self.completed = self.lessons[0].mark_completed(self.student)
+
+    def test_mark_completed(self):
+        # A row that exists but is not completed yet is upserted.
+        LessonProgress.objects.create(
+            user=self.student, lesson=self.lessons[1], completed=False
+        )
+        statuses = self.course.lessons.all().mark_completed(self.student)
+        self.assertEqual(
+            statuses,
+            {
+                self.lessons[0].pk: "already_completed",
+                self.lessons[1].pk: "completed",
+                self.lessons[2].pk: "completed",
+            },
+        )
+        self.assertEqual(
+            LessonProgress.objects.filter(user=self.student, completed=True).count(),
+            3,
+        )
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.completed_lessons, 3)
+        # Rows that were already completed are left alone.
+        self.assertEqual(
+            LessonProgress.objects.get(pk=self.completed.pk).updated_at,
+            self.completed.updated_at,
+        )
+
+        with self.assertNumQueries(2):
+            statuses = self.course.lessons.all().mark_completed(self.student)
+        self.assertEqual(set(statuses.values()), {"already_completed"})
+
+    def test_endpoint(self):
+        self.client.force_authenticate(self.student)
+        response = self.client.post(
+            self.url,
+            {"lesson_ids": [self.lessons[0].pk, self.lessons[1].pk, 0]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(
+            response.json(),
+            {
+                "results": [
+                    {"lesson_id": self.lessons[0].pk, "status": "already_completed"},
+                    {"lesson_id": self.lessons[1].pk, "status": "completed"},
+                    {"lesson_id": 0, "status": "not_found"},
+                ]
+            },
+        )
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.completed_lessons, 2)
+
+    @override_settings(LESSON_BULK_COMPLETE_MAX_IDS=2)
+    def test_number_of_ids_is_capped(self):
+        self.client.force_authenticate(self.student)
+        lesson_ids = [lesson.pk for lesson in self.lessons]
+        response = self.client.post(self.url, lesson_ids[:2] * 2, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        response = self.client.post(self.url, lesson_ids, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(), ["At most 2 lesson_ids can be marked at once."]
+        )
+
+
+class LessonContentTests(CourseTestCase):
+    def test_orphaned_bodies_are_deleted(self):
+        course = self.create_course(lessons=2)
+        first, second = course.lessons.order_by("pk")
+        for lesson in (first, second):
+            lesson.content = "Shared body"
+            lesson.save()
+        shared = first.content_hash
+
+        first.content = "Own body"
+        first.save()
+        self.assertTrue(LessonContent.objects.filter(hash=shared).exists())
+        second.content = ""
+        second.save()
+        self.assertFalse(LessonContent.objects.filter(hash=shared).exists())
+
+        own = first.content_hash
+        first.delete()
+        self.assertFalse(LessonContent.objects.filter(hash=own).exists())
+
+
+@skipUnlessDBFeature("has_select_for_update")
+class LessonContentLockTests(TransactionTestCase):
+    def test_delete_orphans_waits_for_a_concurrent_store(self):
+        instructor = User.objects.create_user(
+            "instructor", password="password", role=User.Role.INSTRUCTOR
+        )
+        course = Course.objects.create(
+            title="Course", description="Description", instructor=instructor
+        )
+        lesson = Lesson.objects.create(
+            title="Lesson", description="Description", course=course
+        )
+        # Left behind by a lesson that changed its body.
+        orphan = LessonContent.objects.create(
+            hash=LessonContent.get_hash(b"Body"), body="Body", size=4
+        )
+        stored, save = threading.Event(), threading.Event()
+
+        def store():
+            try:
+                with transaction.atomic():
+                    lesson.content_blob = LessonContent.store("Body")
+                    stored.set()
+                    save.wait(timeout=5)
+                    lesson.save()
+            finally:
+                connection.close()
+
+        def delete_orphans():
+            try:
+                LessonContent.delete_orphans(orphan.hash)
+            finally:
+                connection.close()
+
+        writer = threading.Thread(target=store)
+        cleaner = threading.Thread(target=delete_orphans)
+        writer.start()
+        self.assertTrue(stored.wait(timeout=5))
+        cleaner.start()
+        # The cleanup waits for the lock of the stored row.
+        cleaner.join(timeout=0.5)
+        self.assertTrue(cleaner.is_alive())
+        save.set()
+        writer.join()
+        cleaner.join()
+
+        lesson.refresh_from_db()
+        self.assertEqual(lesson.content, "Body")
+        self.assertTrue(LessonContent.objects.filter(hash=orphan.hash).exists())
+
+
+class SearchTests(CourseTestCase):
+    """
+    The full text index follows the rows through the signals.
+    """
+
+    lessons_url = "/api/v1/courses/lessons/"
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.instructor)
+
+    def search(self, term, url="/api/v1/courses/"):
+        cache.clear()
+        response = self.client.get(url, {"search": term})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [row["title"] for row in response.json()["results"]]
+
+    def test_index_follows_creates_updates_and_deletes(self):
+        course = self.create_course(title="Django basics")
+        self.assertEqual(self.search("django"), ["Django basics"])
+
+        course.title = "Flask basics"
+        course.save()
+        self.assertEqual(self.search("django"), [])
+        self.assertEqual(self.search("flask"), ["Flask basics"])
+
+        course.delete()
+        self.assertEqual(self.search("flask"), [])
+
+    def test_lessons_are_reindexed_with_their_course(self):
+        course = self.create_course(title="Django basics")
+        self.assertEqual(self.search("django", self.lessons_url), ["Lesson 0"])
+
+        course.title = "Flask basics"
+        course.save()
+        self.assertEqual(self.search("django", self.lessons_url), [])
+        self.assertEqual(self.search("flask", self.lessons_url), ["Lesson 0"])
+
+        course.lessons.get().delete()
+        self.assertEqual(self.search("flask", self.lessons_url), [])
+
+    def test_instructor_rename_is_reindexed(self):
+        self.create_course()
+        self.instructor.username = "guido"
+        self.instructor.save()
+        self.assertEqual(self.search("guido"), ["Course"])
+
+    def test_results_are_ranked_by_relevance(self):
+        self.create_course(title="Cooking", description="With some python")
+        self.create_course(title="Python", description="Python all the way")
+        self.create_course(title="Rust", description="No snakes here")
+        self.assertEqual(self.search("python"), ["Python", "Cooking"])
+
+    @override_settings(COURSE_SEARCH_BACKEND="courses.search.DefaultSearchBackend")
+    def test_default_backend(self):
+        self.create_course(title="Django basics")
+        self.create_course(title="Flask basics")
+        self.assertEqual(self.search("jang"), ["Django basics"])
+        self.assertEqual(self.search("basics django"), ["Django basics"])
+        self.assertEqual(self.search("jang", self.lessons_url), ["Lesson 0"])
+
+    def test_backends_implement_search(self):
+        class Backend(BaseSearchBackend):
+            pass
+
+        with self.assertRaises(TypeError):
+            Backend()
+
+
+class AdminChangelistTests(CourseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_superuser(
+            "admin", "admin@example.com", "password"
+        )
+        self.client.force_login(self.admin)
+
+    def add_courses(self, count):
+        for index in range(count):
+            course = self.create_course(lessons=2, title=f"Course {index}")
+            course.create_enrollment(self.student)
+
+    def assert_constant_queries(self, url, queries):
+        for count in (2, 10):
+            self.add_courses(count)
+            with self.subTest(courses=count), self.assertNumQueries(queries):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+    def test_course_changelist(self):
+        self.assert_constant_queries("/admin/courses/course/", 4)
+
+    def test_lesson_changelist(self):
+        self.assert_constant_queries("/admin/courses/lesson/", 4)
+
+    def test_lesson_changelist_filtered_by_course(self):
+        self.add_courses(1)
+        course = Course.objects.get()
+        self.assert_constant_queries(
+            f"/admin/courses/lesson/?course__id__exact={course.pk}", 5
+        )
+
+
+class QueryPlanTests(CourseTestCase):
+    """
+    The hot lookups use the indexes declared for them. Postgres prefers
+    sequential scans on tables this small, they are disabled for the plan.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.course = self.create_course(lessons=3)
+        self.course.create_enrollment(self.student)
+
+    def explain(self, queryset):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def assertUsesIndex(self, queryset, index):
+        plan = self.explain(queryset)
+        self.assertIn(index, plan, plan)
+
+    def test_catalog_uses_published_index(self):
+        self.assertUsesIndex(
+            Course.objects.filter(is_published=True).order_by("created_at", "id"),
+            "course_published_idx",
+        )
+
+    def test_course_lessons_use_course_active_index(self):
+        self.assertUsesIndex(
+            Lesson.objects.filter(course=self.course, is_active=True).order_by(
+                "created_at"
+            ),
+            "lesson_course_active_idx",
+        )
+
+    def test_enrollment_lookup_uses_unique_constraint(self):
+        # SQLite backs table level unique constraints with an autoindex.
+        self.assertUsesIndex(
+            Enrollment.objects.filter(user=self.student, course=self.course),
+            (
+                "sqlite_autoindex_enrollments_enrollment"
+                if connection.vendor == "sqlite"
+                else "unique_enrollment_user_course"
+            ),
+        )
+
+    def test_completed_progress_lookup_uses_unique_index(self):
+        # The unique (user, lesson) index serves completed lookups too, no
+        # separate partial index is needed.
+        self.assertUsesIndex(
+            LessonProgress.objects.filter(
+                user=self.student, lesson__in=self.course.lessons.all(), completed=True
+            ),
+            "lessonprogress_user_id_lesson_id",
+        )
+
+    def test_keyset_pages_start_the_index_scan_at_the_cursor(self):
+        paginator = KeysetPagination()
+        position = paginator._get_position_from_instance(self.course, None)
+        for reverse in (False, True):
+            with self.subTest(reverse=reverse):
+                plan = self.explain(
+                    paginator.get_page_queryset(Course.objects.all(), position, reverse)
+                )
+                self.assertIn("course_created_at_id_idx", plan, plan)
+                if connection.vendor == "sqlite":
+                    # A range search bounded by the cursor, without a sort.
+                    self.assertIn("(created_at", plan)
+                    self.assertNotIn("TEMP B-TREE", plan)
+
+
+class KeysetPaginationTests(CourseTestCase):
+    def setUp(self):
+        super().setUp()
+        course = self.create_course(lessons=7)
+        # Every lesson shares one timestamp, only the id tells them apart.
+        course.lessons.update(created_at=course.created_at)
+        self.lesson_ids = list(
+            course.lessons.order_by("id").values_list("id", flat=True)
+        )
+        self.client.force_authenticate(self.instructor)
+
+    def walk(self, url, link):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            data = response.json()
+            ids.append([lesson["id"] for lesson in data["results"]])
+            url = data[link]
+        return ids
+
+    def test_pages_rows_sharing_a_timestamp(self):
+        pages = self.walk("/api/v1/courses/lessons/?pagination=keyset&limit=2", "next")
+        self.assertEqual(sum(pages, []), self.lesson_ids)
+        self.assertEqual([len(page) for page in pages], [2, 2, 2, 1])
+
+        last = self.client.get("/api/v1/courses/lessons/?pagination=keyset&limit=2")
+        for _ in range(3):
+            last = self.client.get(last.json()["next"])
+        pages = self.walk(last.json()["previous"], "previous")
+        self.assertEqual(sum(reversed(pages), []), self.lesson_ids[:6])
+
+    def test_fields_without_id_still_page(self):
+        url = "/api/v1/courses/lessons/?pagination=keyset&limit=3&fields=title"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            len(self.client.get(response.json()["next"]).json()["results"]), 3
+        )
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/v1/courses/lessons/?cursor=cD1ub3BlLDE%3D")
+        self.assertEqual(response.status_code, 404)
+
+    @tag("benchmark")
+    def test_benchmark_deep_pages_against_limit_offset(self):
+        Course.objects.bulk_create(
+            (
+                Course(
+                    title=f"Bulk {index}", description="", instructor=self.instructor
+                )
+                for index in range(200_000)
+            ),
+            batch_size=10_000,
+        )
+        # The instructor list, an offset has to aggregate every skipped row.
+        queryset = Course.objects.select_related("instructor").with_lessons_count()
+        factory = APIRequestFactory()
+
+        def page(paginator, url):
+            request = Request(factory.get(url))
+            return paginator.paginate_queryset(queryset, request)
+
+        timings = []
+        for offset in (0, 10_000, 100_000, 199_900):
+            url = f"/api/v1/courses/?limit=50&offset={offset}&count=false"
+            paginator = KeysetPagination()
+            cursor = "/api/v1/courses/?limit=50"
+            if offset:
+                previous = queryset.order_by("created_at", "id")[offset - 1]
+                paginator.base_url = cursor
+                position = paginator._get_position_from_instance(previous, None)
+                cursor = paginator.encode_cursor(Cursor(0, False, position))
+            self.assertEqual(
+                [course.pk for course in page(LimitOffsetPagination(), url)],
+                [course.pk for course in page(paginator, cursor)],
+            )
+            limit_offset = best_of(lambda: page(LimitOffsetPagination(), url))
+            keyset = best_of(lambda: page(KeysetPagination(), cursor))
+            timings.append(
+                f"offset {offset}: limit/offset {limit_offset * 1000:.2f} ms, "
+                f"keyset {keyset * 1000:.2f} ms"
+            )
+        print("\ncourse pages of 50 out of 200k rows\n" + "\n".join(timings))
+
+
+class AsyncViewTests(CourseTestCase):
+    """
+    The async lists answer the same query parameters as the sync lists.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.courses = [
+            self.create_course(lessons=2, title=f"Python {index}") for index in range(3)
+        ]
+        self.create_course(lessons=1, title="Rust")
+        self.create_course(lessons=1, title="Draft", is_published=False)
+        Lesson.objects.filter(title="Lesson 1").update(is_active=False)
+        self.courses[1].create_enrollment(self.student)
+
+    def assert_same_as_sync(self, user, urls):
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+        for url in urls:
+            with self.subTest(user=user.username, url=url):
+                cache.clear()
+                response = self.client.get(url, headers=headers)
+                async_response = async_to_sync(self.async_client.get)(
+                    url.replace("/api/v1/", "/api/v1/async/"), headers=headers
+                )
+                self.assertEqual(async_response.status_code, response.status_code)
+                data = async_response.json()
+                for link in ("next", "previous"):
+                    if isinstance(data, dict) and data.get(link):
+                        data[link] = data[link].replace("/async/", "/")
+                self.assertEqual(data, response.json())
+
+    def test_course_list(self):
+        urls = [
+            "/api/v1/courses/",
+            "/api/v1/courses/?search=python&limit=2",
+            "/api/v1/courses/?search=python&limit=2&offset=2",
+            "/api/v1/courses/?count=false&limit=2",
+            "/api/v1/courses/?count=false&limit=2&offset=2",
+            "/api/v1/courses/?is_published=false",
+        ]
+        self.assert_same_as_sync(self.instructor, urls)
+        self.assert_same_as_sync(
+            self.student, [*urls, "/api/v1/courses/?enrolled=true"]
+        )
+
+    def test_lesson_list(self):
+        course = self.courses[1]
+        urls = [
+            "/api/v1/courses/lessons/",
+            f"/api/v1/courses/lessons/?course={course.pk}",
+            "/api/v1/courses/lessons/?course=0",
+            "/api/v1/courses/lessons/?is_active=false&count=false",
+            "/api/v1/courses/lessons/?search=lesson&limit=1",
+        ]
+        self.assert_same_as_sync(self.instructor, urls)
+        self.assert_same_as_sync(self.student, urls)
+
+    def test_token_user_is_served_from_the_user_cache(self):
+        user_cache.clear()
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(self.student)}"}
+
+        def get():
+            with CaptureQueriesContext(connection) as queries:
+                response = async_to_sync(self.async_client.get)(
+                    "/api/v1/async/courses/lessons/?count=false", headers=headers
+                )
+            self.assertEqual(response.status_code, 200)
+            return [q["sql"] for q in queries if '"users_user"' in q["sql"]]
+
+        self.assertEqual(len(get()), 1)
+        self.assertEqual(get(), [])
+        self.assertEqual(user_cache.stats()["hits"], 1)
+
+    def test_invalid_token(self):
+        response = async_to_sync(self.async_client.get)(
+            "/api/v1/async/courses/", headers={"Authorization": "Bearer invalid"}
+        )
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(
+            response.json(), {"detail": "Given token not valid for any token type"}
+        )
+
+
+class ValuesSerializerParityTests(CourseTestCase):
+    """
+    The values() serializers render byte for byte what the ModelSerializers
+    render for the same rows.
+    """
+
+    model_serializers = {
+        CourseModelViewSet: {"values_serializer_class": None},
+        LessonViewSet: {"values_serializer_class": None},
+    }
+
+    def setUp(self):
+        super().setUp()
+        for index in range(4):
+            course = self.create_course(
+                lessons=2,
+                title=f"Course é {index}",
+                description="Ünïcode\u2028description",
+                is_published=index != 3,
+            )
+            lesson = course.lessons.first()
+            lesson.video_url = "https://example.com/video"
+            lesson.content = f"Body {index}"
+            lesson.save()
+            if index % 2:
+                course.create_enrollment(self.student)
+
+    def get(self, url, patches=None, enforce_budget=True):
+        cache.clear()
+        with ExitStack() as stack:
+            for view, attributes in (patches or {}).items():
+                stack.enter_context(mock.patch.multiple(view, **attributes))
+            if not enforce_budget:
+                stack.enter_context(override_settings(QUERY_BUDGET_ENFORCE=False))
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.content
+
+    def assert_same_output(self, user, urls, values=None, model=None):
+        self.client.force_authenticate(user)
+        for url in urls:
+            with self.subTest(user=user and user.username, url=url):
+                self.assertEqual(
+                    self.get(url, values),
+                    # The reference ModelSerializers are not held to the budgets.
+                    self.get(url, model or self.model_serializers, False),
+                )
+
+    def test_course_lists(self):
+        self.assert_same_output(
+            self.instructor,
+            [
+                "/api/v1/courses/",
+                "/api/v1/courses/?fields=id,title,instructor",
+                "/api/v1/courses/?omit=description,lessons_count",
+            ],
+        )
+        self.assert_same_output(
+            self.student,
+            [
+                "/api/v1/courses/?enrolled=false",
+                "/api/v1/courses/?enrolled=true&fields=id,is_enrolled",
+                "/api/v1/courses/?enrolled=false&omit=description,instructor",
+            ],
+        )
+
+    def test_lesson_lists(self):
+        urls = [
+            "/api/v1/courses/lessons/",
+            "/api/v1/courses/lessons/?fields=id,title,content_hash",
+            "/api/v1/courses/lessons/?omit=description",
+        ]
+        self.assert_same_output(self.instructor, urls)
+        self.assert_same_output(self.student, urls)
+
+    def test_course_summaries(self):
+        urls = [
+            "/api/v1/courses/",
+            "/api/v1/courses/?fields=id,title,instructor",
+            "/api/v1/courses/?omit=description,is_enrolled",
+        ]
+        summaries = {CourseModelViewSet: {"use_course_summaries": lambda view: True}}
+        model = {
+            CourseModelViewSet: {
+                "use_course_summaries": lambda view: False,
+                "values_serializer_class": None,
+            }
+        }
+        self.assert_same_output(None, urls, summaries, model)
+        self.assert_same_output(self.student, urls, summaries, model)
+
+    @tag("benchmark")
+    def test_benchmark_values_against_model_serializer(self):
+        for index in range(200):
+            self.create_course(lessons=0, title=f"Bulk {index}")
+        self.client.force_authenticate(self.instructor)
+        url = "/api/v1/courses/?limit=200"
+        values = best_of(lambda: self.get(url))
+        model = best_of(lambda: self.get(url, self.model_serializers, False))
+        print(
+            f"\ncourse list, 200 rows: values() {values * 1000:.1f} ms, "
+            f"ModelSerializer {model * 1000:.1f} ms"
+        )
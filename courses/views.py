@@ -1,30 +1,73 @@
+import datetime
+
 import django_filters.rest_framework
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import BooleanField, Case, Count, Value, When
+from django.db.models import Count, Max, Prefetch
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from drf_spectacular.utils import OpenApiParameter, OpenApiTypes, extend_schema
-from rest_framework import filters, permissions, serializers, viewsets
+from rest_framework import permissions, serializers, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.response import Response
 
+from utils.conditional import ConditionalMixin
+from utils.http import IgnoreClientContentNegotiation, ranged_response
+from utils.pagination import KeysetPaginationMixin
+from utils.parsers import CSVParser, JSONLinesParser, ORJSONParser
+from utils.renderers import stream_json_array
+from utils.serializers import SparseFieldsMixin, ValuesListMixin
+
+from . import cache as catalog_cache
 from .filters import CourseFilter
-from .models import Course, Lesson
-from .serializers import (CourseDetailSerializer, CourseSerializer,
-                          LessonSerializer)
+from .models import Course, CourseSummary, Lesson
+from .search import DefaultSearchBackend, FullTextSearchFilter, get_search_backend
+from .serializers import (
+    CourseDetailSerializer,
+    CourseSerializer,
+    CourseSummaryValuesSerializer,
+    CourseValuesSerializer,
+    LessonSerializer,
+    LessonStubSerializer,
+    LessonValuesSerializer,
+)
 
 User = get_user_model()
 
 
-class CourseModelViewSet(viewsets.ModelViewSet):
+class CourseModelViewSet(
+    KeysetPaginationMixin,
+    ConditionalMixin,
+    SparseFieldsMixin,
+    ValuesListMixin,
+    viewsets.ModelViewSet,
+):
     model = Course
-    queryset = Course.objects.filter(is_published=True).prefetch_related("enrollments")
+    queryset = Course.objects.filter(is_published=True)
     serializer_class = CourseSerializer
+    values_serializer_class = CourseValuesSerializer
     filter_backends = (
         django_filters.rest_framework.DjangoFilterBackend,
-        filters.SearchFilter,
+        FullTextSearchFilter,
     )
     filterset_class = CourseFilter
     search_fields = ("title", "description", "instructor__username")
+    is_catalog_page = False
+    catalog_page_key = None
+    # Catalog pages with only these parameters are read from CourseSummary.
+    summary_query_params = frozenset(
+        ("limit", "offset", "count", "cursor", "pagination", "fields", "omit", "format")
+    )
+    # Worst case with session authentication and cold caches.
+    query_budgets = {
+        "list": 6,
+        "retrieve": 6,
+        "get_progress": 3,
+        "progress": 3,
+        "my_progress": 3,
+        "analytics": 9,
+    }
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -36,43 +79,167 @@ class CourseModelViewSet(viewsets.ModelViewSet):
             return CourseDetailSerializer
         return CourseSerializer
 
+    def get_detail_queryset(self):
+        """
+        Course with its instructor, active lessons and the enrollment flag of
+        the requesting user, loaded in a fixed number of queries.
+        """
+        user = self.request.user
+        queryset = Course.objects.all()
+        if self.is_field_requested("instructor"):
+            queryset = queryset.select_related("instructor")
+        if self.is_field_requested("lessons"):
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "lessons",
+                    queryset=Lesson.objects.filter(is_active=True),
+                    to_attr="active_lessons",
+                )
+            )
+        if user.is_authenticated and user.is_instructor:
+            return queryset.filter(instructor=user)
+        queryset = queryset.filter(is_published=True)
+        if user.is_authenticated:
+            queryset = queryset.with_is_enrolled(user)
+        return queryset
+
     def get_queryset(self):
+        if self.action in ["retrieve", "update", "partial_update"]:
+            return self.get_detail_queryset()
         queryset = super().get_queryset()
         user = self.request.user
         if user.is_authenticated and user.is_instructor:
-            return Course.objects.filter(instructor=user).annotate(
-                lessons_count=Count("lessons", distinct=True)
-            )
-        queryset = queryset.annotate(lessons_count=Count("lessons", distinct=True))
+            return Course.objects.filter(instructor=user).with_lessons_count()
+        queryset = queryset.with_lessons_count()
 
-        if user.is_authenticated and user.is_student:
-            queryset = queryset.annotate(
-                is_enrolled=Case(
-                    When(enrollments__user=user, then=Value(True)),
-                    default=Value(False),
-                    output_field=BooleanField(),
-                )
-            )
+        if user.is_authenticated and user.is_student and not self.is_catalog_page:
+            queryset = queryset.with_is_enrolled(user)
         return queryset
 
+    def get_catalog_page_key(self):
+        # Read once per request, before anything is queried.
+        if self.catalog_page_key is None:
+            self.catalog_page_key = catalog_cache.get_catalog_page_key(self.request)
+        return self.catalog_page_key
+
+    def is_catalog_request(self):
+        """
+        Whether the list is the shared catalog, which is cached per URL.
+        """
+        user = self.request.user
+        if user.is_authenticated and user.is_instructor:
+            return False
+        # The enrolled filter is per user, the page itself can not be shared.
+        return "enrolled" not in self.request.query_params
+
+    def use_course_summaries(self):
+        """
+        Whether the catalog page can be served from ``CourseSummary``. Filters
+        and full text search backends need the course table, plain substring
+        search runs on the summary search text.
+        """
+        query_params = set(self.request.query_params)
+        if isinstance(get_search_backend(), DefaultSearchBackend):
+            query_params.discard(FullTextSearchFilter.search_param)
+        return query_params <= self.summary_query_params
+
+    def get_summary_queryset(self):
+        queryset = CourseSummary.objects.order_by("created_at", "id")
+        for term in FullTextSearchFilter().get_search_terms(self.request):
+            queryset = queryset.filter(search_text__contains=term.lower())
+        return queryset
+
+    def get_validator_aggregates(self, queryset):
+        if self.action == "list" and self.is_catalog_request():
+            key = self.get_catalog_page_key()
+            aggregates = catalog_cache.get_cached_catalog_validators(key)
+            if aggregates is None:
+                aggregates = self.aggregate_validators(queryset)
+                catalog_cache.set_cached_catalog_validators(key, aggregates)
+            return aggregates
+        return self.aggregate_validators(queryset)
+
+    @staticmethod
+    def aggregate_validators(queryset):
+        return queryset.aggregate(
+            last_modified=Max("updated_at"),
+            count=Count("pk", distinct=True),
+            lessons_last_modified=Max("lessons__updated_at"),
+            lessons_count=Count("lessons"),
+        )
+
+    def get_etag_parts(self):
+        parts = super().get_etag_parts()
+        # Bumped when an instructor changes, the rows carry their profile.
+        parts += (catalog_cache.get_catalog_version(),)
+        user = self.request.user
+        if user.is_authenticated and user.is_student:
+            parts += (sorted(catalog_cache.get_enrolled_course_ids(user)),)
+        return parts
+
+    def get_validators(self):
+        if self.action == "retrieve":
+            user = self.request.user
+            if not user.is_authenticated:
+                return None
+            if not user.is_instructor:
+                # Unenrolled students get the error of the regular path.
+                enrolled = catalog_cache.get_enrolled_course_ids(user)
+                if self.kwargs["pk"] not in {str(pk) for pk in enrolled}:
+                    return None
+        return super().get_validators()
+
+    def list(self, request, *args, **kwargs):
+        not_modified = self.get_not_modified_response(request)
+        if not_modified is not None:
+            return not_modified
+
+        if not self.is_catalog_request():
+            return super().list(request, *args, **kwargs)
+
+        # Catalog pages are cached without the per-user is_enrolled flag,
+        # students get it overlaid from their set of enrolled course ids.
+        user = request.user
+        key = self.get_catalog_page_key()
+        data = catalog_cache.get_cached_catalog_page(key)
+        if data is None:
+            self.is_catalog_page = True
+            if self.use_course_summaries():
+                serializer = CourseSummaryValuesSerializer
+                fieldset = self.get_fieldset()
+                if fieldset is not None:
+                    serializer = serializer.prune(fieldset)
+                response = self.list_values(self.get_summary_queryset(), serializer)
+            else:
+                response = super().list(request, *args, **kwargs)
+            data = response.data
+            catalog_cache.set_cached_catalog_page(key, data)
+        if user.is_authenticated and user.is_student:
+            data = catalog_cache.overlay_enrollments(data, user)
+        return Response(data)
+
     def destroy(self, request, *args, **kwargs):
         if not request.user.is_authenticated or request.user.is_student:
             raise PermissionDenied
         return super().destroy(request, *args, **kwargs)
 
     def retrieve(self, request, *args, **kwargs):
+        not_modified = self.get_not_modified_response(request)
+        if not_modified is not None:
+            return not_modified
+
         user = request.user
         course = self.get_object()
         if not user.is_authenticated:
             raise serializers.ValidationError(
                 "You must be authenticated to see course details."
             )
-        is_enrolled = course.get_is_enrolled(user)
-        if user.is_authenticated and not user.is_instructor and not is_enrolled:
+        if not user.is_instructor and not course.is_enrolled:
             raise serializers.ValidationError(
                 "To see course details you must be enroll it."
             )
-        return super().retrieve(request, *args, **kwargs)
+        serializer = self.get_serializer(course)
+        return Response(serializer.data)
 
     @action(detail=True, methods=["post"])
     def publish(self, request, pk=None):
@@ -114,6 +281,107 @@ class CourseModelViewSet(viewsets.ModelViewSet):
         course.create_enrollment(request.user)
         return Response({"status": "enrollment created"})
 
+    @staticmethod
+    def get_bulk_user_ids(data):
+        rows = data.get("user_ids", []) if isinstance(data, dict) else data
+        try:
+            return [
+                int(row["user_id"] if isinstance(row, dict) else row) for row in rows
+            ]
+        except (KeyError, TypeError, ValueError):
+            raise serializers.ValidationError(
+                "Every row must contain an integer user_id."
+            )
+
+    @extend_schema(
+        request={
+            "application/json": OpenApiTypes.OBJECT,
+            "text/csv": OpenApiTypes.STR,
+            "application/x-ndjson": OpenApiTypes.STR,
+        },
+        responses={
+            200: OpenApiTypes.OBJECT,
+            400: OpenApiTypes.OBJECT,
+        },
+        operation_id="bulkEnroll",
+    )
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="bulk-enroll",
+        parser_classes=[ORJSONParser, CSVParser, JSONLinesParser],
+    )
+    def bulk_enroll(self, request, pk=None):
+        user = request.user
+        if not user.is_authenticated or not (user.is_instructor or user.is_admin):
+            raise PermissionDenied
+        course = self.get_object()
+        results = course.bulk_enroll(self.get_bulk_user_ids(request.data))
+        return Response(
+            {
+                "results": [
+                    {"user_id": user_id, "status": status}
+                    for user_id, status in results.items()
+                ]
+            }
+        )
+
+    def get_enrollments(self):
+        """
+        Student enrollments in the courses visible to the requesting user.
+        """
+        from enrollments.models import Enrollment
+
+        user = self.request.user
+        enrollments = Enrollment.objects.filter(user__role=User.Role.STUDENT)
+        if user.is_authenticated and user.is_instructor:
+            return enrollments.filter(course__instructor=user)
+        return enrollments.filter(course__is_published=True)
+
+    @staticmethod
+    def get_user_ids(request):
+        user_ids = request.GET.get("user_ids")
+        if not user_ids:
+            return None
+        try:
+            return [int(user_id) for user_id in user_ids.split(",") if user_id]
+        except ValueError:
+            raise serializers.ValidationError(
+                "user_ids must be a comma separated list of integers."
+            )
+
+    @staticmethod
+    def get_pending_completions(user_ids):
+        """
+        Queued completions per ``(user_id, course_id)`` of ``user_ids``, every
+        user when ``None``, empty without the write-behind queue.
+        """
+        if not settings.LESSON_PROGRESS_WRITE_BEHIND:
+            return {}
+        from enrollments.queue import (
+            count_pending_completions_by_enrollment,
+            get_progress_queue,
+        )
+
+        return count_pending_completions_by_enrollment(get_progress_queue(), user_ids)
+
+    @staticmethod
+    def merge_pending(rows, pending):
+        # Readers see their own queued writes, as in get_progress.
+        for user_id, course_id, completed, active in rows:
+            completed += pending.get((user_id, course_id), 0)
+            yield user_id, course_id, completed, active
+
+    @staticmethod
+    def stream_progress(items):
+        """
+        JSON array of the ``items``, encoded while the server side cursor is
+        read instead of built in memory first.
+        """
+        return StreamingHttpResponse(
+            stream_json_array(items), content_type="application/json"
+        )
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -134,49 +402,220 @@ class CourseModelViewSet(viewsets.ModelViewSet):
     def get_progress(self, request, pk=None):
         from django.shortcuts import get_object_or_404
 
-        from enrollments.models import LessonProgress
-
         user_id = request.GET.get("user_id")
         if user_id is None:
             raise serializers.ValidationError("user_id parameter is required.")
-        user = get_object_or_404(User, pk=user_id)
-        course = self.get_object()
-        if not user.is_student:
-            raise serializers.ValidationError("User must be a student to get progress.")
-        if not course.get_is_enrolled(user):
+
+        enrollment = (
+            self.get_enrollments().filter(course_id=pk, user_id=user_id).first()
+        )
+
+        if enrollment is None:
+            # Slow path, only taken to report why there is no progress.
+            user = get_object_or_404(User, pk=user_id)
+            self.get_object()
+            if not user.is_student:
+                raise serializers.ValidationError(
+                    "User must be a student to get progress."
+                )
             raise serializers.ValidationError("User is not enrolled in this course.")
 
-        lessons_count = course.lessons.count()
-        completed_lessons = LessonProgress.objects.filter(
-            user=user, lesson__course=course, completed=True
-        ).count()
-        progress = (completed_lessons / lessons_count) * 100 if lessons_count > 0 else 0
+        if settings.LESSON_PROGRESS_WRITE_BEHIND:
+            from enrollments.queue import count_pending_completions, get_progress_queue
+
+            enrollment.completed_lessons += count_pending_completions(
+                enrollment, get_progress_queue()
+            )
+
         return Response(
             {
-                "progress": progress,
-                "completed_lessons": completed_lessons,
-                "lessons_count": lessons_count,
+                "progress": enrollment.progress,
+                "completed_lessons": enrollment.completed_lessons,
+                "lessons_count": enrollment.active_lessons,
+            }
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="user_ids",
+                description="Comma separated student ids, defaults to all enrolled",
+                required=False,
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+            )
+        ],
+        responses={
+            200: OpenApiTypes.OBJECT,
+            400: OpenApiTypes.OBJECT,
+        },
+        operation_id="getCourseProgressBulk",
+    )
+    @action(detail=True, methods=["get"])
+    def progress(self, request, pk=None):
+        from enrollments.models import Enrollment
+
+        user = request.user
+        if not user.is_authenticated:
+            raise serializers.ValidationError(
+                "You must be authenticated to see progress."
+            )
+        enrollments = self.get_enrollments().filter(course_id=pk)
+        if not user.is_instructor:
+            enrollments = enrollments.filter(user=user)
+        user_ids = self.get_user_ids(request)
+        if user_ids is not None:
+            enrollments = enrollments.filter(user_id__in=user_ids)
+
+        pending = self.get_pending_completions(
+            user_ids if user.is_instructor else [user.pk]
+        )
+        rows = enrollments.order_by("user_id").values_list(
+            "user_id", "course_id", "completed_lessons", "active_lessons"
+        )
+        return self.stream_progress(
+            {
+                "user_id": user_id,
+                "progress": Enrollment.calculate_progress(completed, active),
+                "completed_lessons": completed,
+                "lessons_count": active,
             }
+            for user_id, course_id, completed, active in self.merge_pending(
+                rows.iterator(), pending
+            )
         )
 
+    @staticmethod
+    def get_analytics_range(request):
+        """
+        Inclusive ``start`` and ``end`` dates of the daily curves, the last
+        30 days by default and at most a year.
+        """
+        try:
+            end = request.GET.get("end")
+            end = datetime.date.fromisoformat(end) if end else timezone.localdate()
+            start = request.GET.get("start")
+            start = (
+                datetime.date.fromisoformat(start)
+                if start
+                else end - datetime.timedelta(days=29)
+            )
+        except ValueError:
+            raise serializers.ValidationError(
+                "start and end must be dates in the YYYY-MM-DD format."
+            )
+        if start > end:
+            raise serializers.ValidationError("start must not be after end.")
+        if (end - start).days >= 366:
+            raise serializers.ValidationError("The range can span at most 366 days.")
+        return start, end
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="start",
+                description=(
+                    "First day of the daily curves, defaults to 29 days before end"
+                ),
+                required=False,
+                type=OpenApiTypes.DATE,
+                location=OpenApiParameter.QUERY,
+            ),
+            OpenApiParameter(
+                name="end",
+                description="Last day of the daily curves, defaults to today",
+                required=False,
+                type=OpenApiTypes.DATE,
+                location=OpenApiParameter.QUERY,
+            ),
+        ],
+        responses={
+            200: OpenApiTypes.OBJECT,
+            400: OpenApiTypes.OBJECT,
+        },
+        operation_id="getCourseAnalytics",
+    )
+    @action(detail=True, methods=["get"])
+    def analytics(self, request, pk=None):
+        """
+        Per lesson completion funnel and daily enrollment curve of the
+        course, served from the rollups of ``update_analytics_rollups``.
+        """
+        from enrollments.rollups import get_course_analytics
+
+        user = request.user
+        if not user.is_authenticated or not (user.is_instructor or user.is_admin):
+            raise PermissionDenied
+        start, end = self.get_analytics_range(request)
+        course = self.get_object()
+        return Response(get_course_analytics(course, start, end))
+
+    @extend_schema(
+        responses={
+            200: OpenApiTypes.OBJECT,
+            400: OpenApiTypes.OBJECT,
+        },
+        operation_id="getMyCoursesProgress",
+    )
+    @action(detail=False, methods=["get"], url_path="my-progress")
+    def my_progress(self, request):
+        from enrollments.models import Enrollment
 
-class LessonViewSet(viewsets.ModelViewSet):
+        user = request.user
+        if not user.is_authenticated or not user.is_student:
+            raise serializers.ValidationError(
+                "You must be a student to see your progress."
+            )
+        pending = self.get_pending_completions([user.pk])
+        rows = (
+            self.get_enrollments()
+            .filter(user=user)
+            .order_by("course_id")
+            .values_list("user_id", "course_id", "completed_lessons", "active_lessons")
+        )
+        return self.stream_progress(
+            {
+                "course_id": course_id,
+                "progress": Enrollment.calculate_progress(completed, active),
+                "completed_lessons": completed,
+                "lessons_count": active,
+            }
+            for _, course_id, completed, active in self.merge_pending(
+                rows.iterator(), pending
+            )
+        )
+
+
+class LessonViewSet(
+    KeysetPaginationMixin,
+    ConditionalMixin,
+    SparseFieldsMixin,
+    ValuesListMixin,
+    viewsets.ModelViewSet,
+):
     model = Lesson
     queryset = Lesson.objects.all()
     serializer_class = LessonSerializer
+    values_serializer_class = LessonValuesSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = (
         django_filters.rest_framework.DjangoFilterBackend,
-        filters.SearchFilter,
+        FullTextSearchFilter,
     )
     search_fields = ("title", "description", "course__title", "course__description")
     filterset_fields = ("course", "is_active")
+    query_budgets = {"list": 8, "retrieve": 5, "content": 4}
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context["request"] = self.request
         return context
 
+    def get_serializer_class(self):
+        if self.action == "list":
+            return LessonStubSerializer
+        return LessonSerializer
+
     def get_queryset(self):
         queryset = super().get_queryset()
         user = self.request.user
@@ -186,29 +625,128 @@ class LessonViewSet(viewsets.ModelViewSet):
             ).distinct()
         if user.is_instructor:
             queryset = queryset.filter(course__instructor=user)
+        if self.action == "retrieve":
+            queryset = queryset.select_related("content_blob")
         return queryset
 
+    def get_etag_parts(self):
+        parts = super().get_etag_parts()
+        user = self.request.user
+        if user.is_student:
+            parts += (sorted(catalog_cache.get_enrolled_course_ids(user)),)
+        return parts
+
+    def list(self, request, *args, **kwargs):
+        not_modified = self.get_not_modified_response(request)
+        if not_modified is not None:
+            return not_modified
+        return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        not_modified = self.get_not_modified_response(request)
+        if not_modified is not None:
+            return not_modified
+        return super().retrieve(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         if not self.request.user.is_instructor:
             raise PermissionDenied
-        return super().perform_create(serializer)
+        super().perform_create(serializer)
 
     def perform_update(self, serializer):
         if not self.request.user.is_instructor:
             raise PermissionDenied
-        return super().perform_update(serializer)
+        super().perform_update(serializer)
+
+    @extend_schema(
+        responses={(200, "text/plain"): OpenApiTypes.STR},
+        parameters=[
+            OpenApiParameter(
+                name="Range",
+                type=str,
+                location=OpenApiParameter.HEADER,
+                description="Single byte range, e.g. bytes=0-1023.",
+            )
+        ],
+    )
+    @action(
+        detail=True,
+        methods=["get"],
+        content_negotiation_class=IgnoreClientContentNegotiation,
+    )
+    def content(self, request, pk=None):
+        """
+        Lesson body with a strong ETag, the hash of the content, and support
+        for single byte range requests.
+        """
+        lesson = self.get_object()
+        if lesson.content_blob_id is None:
+            raise NotFound("This lesson has no content.")
+        return ranged_response(
+            request,
+            etag=f'"{lesson.content_blob_id}"',
+            load=lambda: lesson.content_blob.body.encode(),
+            content_type="text/plain; charset=utf-8",
+        )
 
     @action(detail=True, methods=["post"])
     def mark_as_completed(self, request, pk=None):
-        from enrollments.models import LessonProgress
+        lesson = self.get_object()
+        if settings.LESSON_PROGRESS_WRITE_BEHIND:
+            from enrollments.queue import get_progress_queue
 
-        LessonProgress.objects.update_or_create(
-            user=request.user,
-            lesson=self.get_object(),
-            defaults={"completed": True},
-        )
+            get_progress_queue().append(request.user.pk, [lesson.pk])
+            return Response(
+                {"status": "lesson completion accepted"},
+                status=status.HTTP_202_ACCEPTED,
+            )
+        lesson.mark_completed(request.user)
         return Response({"status": "lesson completed"})
 
+    @extend_schema(
+        request=OpenApiTypes.OBJECT,
+        responses={
+            200: OpenApiTypes.OBJECT,
+            400: OpenApiTypes.OBJECT,
+        },
+        operation_id="bulkMarkLessonsAsCompleted",
+    )
+    @action(detail=False, methods=["post"], url_path="mark-as-completed")
+    def bulk_mark_as_completed(self, request):
+        data = request.data
+        lesson_ids = data.get("lesson_ids") if isinstance(data, dict) else data
+        try:
+            lesson_ids = list(dict.fromkeys(int(pk) for pk in lesson_ids))
+        except (TypeError, ValueError):
+            raise serializers.ValidationError("lesson_ids must be a list of integers.")
+        max_ids = settings.LESSON_BULK_COMPLETE_MAX_IDS
+        if len(lesson_ids) > max_ids:
+            raise serializers.ValidationError(
+                f"At most {max_ids} lesson_ids can be marked at once."
+            )
+        lessons = self.get_queryset().filter(pk__in=lesson_ids)
+
+        if settings.LESSON_PROGRESS_WRITE_BEHIND:
+            from enrollments.queue import get_progress_queue
+
+            accepted_ids = list(lessons.order_by().values_list("pk", flat=True))
+            get_progress_queue().append(request.user.pk, accepted_ids)
+            statuses = dict.fromkeys(accepted_ids, "accepted")
+            response_status = status.HTTP_202_ACCEPTED
+        else:
+            statuses = lessons.mark_completed(request.user)
+            response_status = status.HTTP_200_OK
+
+        return Response(
+            {
+                "results": [
+                    {"lesson_id": pk, "status": statuses.get(pk, "not_found")}
+                    for pk in lesson_ids
+                ]
+            },
+            status=response_status,
+        )
+
     def destroy(self, request, *args, **kwargs):
         if request.user.is_student:
             raise PermissionDenied
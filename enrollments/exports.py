@@ -0,0 +1,107 @@
+"""
+Streaming exports of enrollments joined with their lesson progress.
+
+Both sides are read with server side cursors, ordered by (course, user), and
+merge joined in Python, so memory stays flat however many rows are exported.
+"""
+
+import csv
+import json
+
+from .models import Enrollment, LessonProgress
+
+EXPORT_FIELDS = (
+    "enrollment_id",
+    "course_id",
+    "user_id",
+    "username",
+    "enrolled_at",
+    "completed_lessons",
+    "active_lessons",
+    "lesson_id",
+    "lesson_completed",
+    "lesson_updated_at",
+)
+
+
+def iter_progress_rows(enrollments=None, chunk_size=2000):
+    """
+    Yield one tuple per (enrollment, lesson progress) pair, in the order of
+    ``EXPORT_FIELDS``. Enrollments without any progress yield a single row
+    with empty lesson columns.
+    """
+    if enrollments is None:
+        enrollments = Enrollment.objects.all()
+    enrollment_rows = (
+        enrollments.order_by("course_id", "user_id")
+        .values_list(
+            "id",
+            "course_id",
+            "user_id",
+            "user__username",
+            "created_at",
+            "completed_lessons",
+            "active_lessons",
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+    progress_rows = (
+        LessonProgress.objects.filter(
+            lesson__course__in=enrollments.values("course_id")
+        )
+        .order_by("lesson__course_id", "user_id", "lesson_id")
+        .values_list(
+            "lesson__course_id", "user_id", "lesson_id", "completed", "updated_at"
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+
+    progress = next(progress_rows, None)
+    for enrollment in enrollment_rows:
+        key = (enrollment[1], enrollment[2])
+        # Progress of users that are no longer enrolled is skipped.
+        while progress is not None and progress[:2] < key:
+            progress = next(progress_rows, None)
+        matched = False
+        while progress is not None and progress[:2] == key:
+            matched = True
+            yield enrollment + progress[2:]
+            progress = next(progress_rows, None)
+        if not matched:
+            yield enrollment + (None, None, None)
+
+
+def serialize_value(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+class Echo:
+    """
+    File-like object whose write() returns the value, for csv.writer.
+    """
+
+    def write(self, value):
+        return value
+
+
+def render_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow(
+            ["" if value is None else serialize_value(value) for value in row]
+        )
+
+
+def render_ndjson(rows):
+    for row in rows:
+        record = dict(zip(EXPORT_FIELDS, map(serialize_value, row)))
+        yield json.dumps(record) + "\n"
+
+
+RENDERERS = {
+    "csv": ("text/csv", render_csv),
+    "ndjson": ("application/x-ndjson", render_ndjson),
+}
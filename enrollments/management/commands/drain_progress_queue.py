@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from enrollments.queue import ProgressQueue, drain
+
+
+class Command(BaseCommand):
+    help = "Apply queued lesson completions to LessonProgress in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain what is queued and exit instead of polling forever.",
+        )
+
+    def handle(self, *args, **options):
+        queue = ProgressQueue()
+        while True:
+            consumed = drain(queue, batch_size=options["batch_size"])
+            if consumed:
+                self.stdout.write(f"Applied {consumed} lesson completions.")
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,36 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from enrollments.exports import RENDERERS, iter_progress_rows
+from enrollments.models import Enrollment
+
+
+class Command(BaseCommand):
+    help = "Stream enrollments joined with lesson progress as CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=sorted(RENDERERS), default="ndjson")
+        parser.add_argument(
+            "--course",
+            type=int,
+            action="append",
+            dest="courses",
+            help="Only export this course id (can be repeated).",
+        )
+        parser.add_argument("--output", help="File to write, defaults to stdout.")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        enrollments = Enrollment.objects.all()
+        if options["courses"]:
+            enrollments = enrollments.filter(course_id__in=options["courses"])
+        _, render = RENDERERS[options["format"]]
+        rows = iter_progress_rows(enrollments, chunk_size=options["chunk_size"])
+
+        output = open(options["output"], "w") if options["output"] else sys.stdout
+        try:
+            output.writelines(render(rows))
+        finally:
+            if output is not sys.stdout:
+                output.close()
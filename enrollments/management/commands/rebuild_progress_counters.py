@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from enrollments.models import Enrollment
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized enrollment progress counters from LessonProgress."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--course",
+            type=int,
+            action="append",
+            dest="courses",
+            help="Only rebuild enrollments of this course id (can be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        enrollments = Enrollment.objects.all()
+        if options["courses"]:
+            enrollments = enrollments.filter(course_id__in=options["courses"])
+        updated = enrollments.refresh_counters()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt progress counters for {updated} enrollments.")
+        )
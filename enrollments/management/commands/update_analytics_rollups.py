@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from enrollments.rollups import backfill_rollups, update_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold enrollments and lesson completions written since the last run "
+        "into the daily course analytics rollups."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--backfill",
+            action="store_true",
+            help="Drop the rollups and rebuild them from the full history.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of courses or lessons recounted per query.",
+        )
+
+    def handle(self, *args, **options):
+        roll_up = backfill_rollups if options["backfill"] else update_rollups
+        updated = roll_up(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Recounted {updated['enrollments']} courses and "
+                f"{updated['lesson_completions']} lessons."
+            )
+        )
@@ -0,0 +1,59 @@
+# Generated by Django 4.2 on 2026-10-17 03:48
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Enrollment = apps.get_model("enrollments", "Enrollment")
+    LessonProgress = apps.get_model("enrollments", "LessonProgress")
+    Lesson = apps.get_model("courses", "Lesson")
+
+    active_lessons = (
+        Lesson.objects.filter(course=OuterRef("course"), is_active=True)
+        .order_by()
+        .values("course")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    completed_lessons = (
+        LessonProgress.objects.filter(
+            user=OuterRef("user"),
+            lesson__course=OuterRef("course"),
+            lesson__is_active=True,
+            completed=True,
+        )
+        .order_by()
+        .values("user")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    Enrollment.objects.update(
+        active_lessons=Coalesce(Subquery(active_lessons), 0),
+        completed_lessons=Coalesce(Subquery(completed_lessons), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0003_lesson_is_active_alter_lesson_course"),
+        ("enrollments", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="enrollment",
+            name="active_lessons",
+            field=models.PositiveIntegerField(default=0, verbose_name="Active Lessons"),
+        ),
+        migrations.AddField(
+            model_name="enrollment",
+            name="completed_lessons",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Completed Lessons"
+            ),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def dedup_enrollments(apps, schema_editor):
+    """
+    Keep the oldest enrollment of every (user, course) pair so the unique
+    constraint added by the next migration can be created.
+    """
+    Enrollment = apps.get_model("enrollments", "Enrollment")
+
+    duplicates = (
+        Enrollment.objects.order_by()
+        .values("user_id", "course_id")
+        .annotate(keep_id=Min("id"), total=Count("id"))
+        .filter(total__gt=1)
+    )
+    for duplicate in duplicates.iterator():
+        Enrollment.objects.filter(
+            user_id=duplicate["user_id"], course_id=duplicate["course_id"]
+        ).exclude(id=duplicate["keep_id"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("enrollments", "0003_enrollment_progress_counters"),
+    ]
+
+    operations = [
+        migrations.RunPython(dedup_enrollments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2 on 2026-10-17 03:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("enrollments", "0004_dedup_enrollments"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="enrollment",
+            constraint=models.UniqueConstraint(
+                fields=("user", "course"), name="unique_enrollment_user_course"
+            ),
+        ),
+    ]
@@ -0,0 +1,121 @@
+# Generated by Django 4.2 on 2026-10-17 04:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0008_course_summary"),
+        ("enrollments", "0005_enrollment_unique_constraint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyEnrollmentRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Date")),
+                (
+                    "enrollments",
+                    models.PositiveIntegerField(default=0, verbose_name="Enrollments"),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="DailyLessonCompletionRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Date")),
+                (
+                    "completions",
+                    models.PositiveIntegerField(default=0, verbose_name="Completions"),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="RollupWatermark",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=50, primary_key=True, serialize=False),
+                ),
+                ("value", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="enrollment",
+            index=models.Index(fields=["created_at"], name="enrollment_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="lessonprogress",
+            index=models.Index(
+                fields=["updated_at"], name="lessonprogress_updated_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="dailylessoncompletionrollup",
+            name="course",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="daily_completions",
+                to="courses.course",
+                verbose_name="Course",
+            ),
+        ),
+        migrations.AddField(
+            model_name="dailylessoncompletionrollup",
+            name="lesson",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="daily_completions",
+                to="courses.lesson",
+                verbose_name="Lesson",
+            ),
+        ),
+        migrations.AddField(
+            model_name="dailyenrollmentrollup",
+            name="course",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="daily_enrollments",
+                to="courses.course",
+                verbose_name="Course",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dailylessoncompletionrollup",
+            index=models.Index(
+                fields=["course", "date"], name="completion_course_date_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="dailylessoncompletionrollup",
+            constraint=models.UniqueConstraint(
+                fields=("lesson", "date"), name="unique_daily_completion_rollup"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="dailyenrollmentrollup",
+            constraint=models.UniqueConstraint(
+                fields=("course", "date"), name="unique_daily_enrollment_rollup"
+            ),
+        ),
+    ]
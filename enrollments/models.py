@@ -1,8 +1,43 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
 from utils.models import BaseModel
 
 
+class EnrollmentQuerySet(models.QuerySet):
+    def refresh_counters(self):
+        """
+        Recompute the denormalized progress counters of the selected
+        enrollments from ``Lesson`` and ``LessonProgress`` in a single UPDATE.
+        """
+        from courses.models import Lesson
+
+        active_lessons = (
+            Lesson.objects.filter(course=OuterRef("course"), is_active=True)
+            .order_by()
+            .values("course")
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+        completed_lessons = (
+            LessonProgress.objects.filter(
+                user=OuterRef("user"),
+                lesson__course=OuterRef("course"),
+                lesson__is_active=True,
+                completed=True,
+            )
+            .order_by()
+            .values("user")
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+        return self.update(
+            active_lessons=Coalesce(Subquery(active_lessons), 0),
+            completed_lessons=Coalesce(Subquery(completed_lessons), 0),
+        )
+
+
 class Enrollment(BaseModel):
     user = models.ForeignKey(
         "users.User",
@@ -16,6 +51,35 @@ class Enrollment(BaseModel):
         related_name="enrollments",
         verbose_name="Course",
     )
+    completed_lessons = models.PositiveIntegerField(
+        default=0, verbose_name="Completed Lessons"
+    )
+    active_lessons = models.PositiveIntegerField(
+        default=0, verbose_name="Active Lessons"
+    )
+
+    objects = EnrollmentQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "course"], name="unique_enrollment_user_course"
+            ),
+        ]
+        indexes = [
+            # Watermark scans of the analytics rollups.
+            models.Index(fields=["created_at"], name="enrollment_created_idx"),
+        ]
+
+    @staticmethod
+    def calculate_progress(completed_lessons, active_lessons):
+        if active_lessons == 0:
+            return 0
+        return min(completed_lessons / active_lessons * 100, 100)
+
+    @property
+    def progress(self):
+        return self.calculate_progress(self.completed_lessons, self.active_lessons)
 
 
 class LessonProgress(BaseModel):
@@ -35,3 +99,65 @@ class LessonProgress(BaseModel):
 
     class Meta:
         unique_together = ("user", "lesson")
+        indexes = [
+            # Watermark scans of the analytics rollups.
+            models.Index(fields=["updated_at"], name="lessonprogress_updated_idx"),
+        ]
+
+
+class RollupWatermark(models.Model):
+    """
+    Timestamp up to which a source table has been folded into the daily
+    rollups, see ``enrollments.rollups``.
+    """
+
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.value}"
+
+
+class DailyEnrollmentRollup(models.Model):
+    course = models.ForeignKey(
+        "courses.Course",
+        on_delete=models.CASCADE,
+        related_name="daily_enrollments",
+        verbose_name="Course",
+    )
+    date = models.DateField(verbose_name="Date")
+    enrollments = models.PositiveIntegerField(default=0, verbose_name="Enrollments")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["course", "date"], name="unique_daily_enrollment_rollup"
+            ),
+        ]
+
+
+class DailyLessonCompletionRollup(models.Model):
+    course = models.ForeignKey(
+        "courses.Course",
+        on_delete=models.CASCADE,
+        related_name="daily_completions",
+        verbose_name="Course",
+    )
+    lesson = models.ForeignKey(
+        "courses.Lesson",
+        on_delete=models.CASCADE,
+        related_name="daily_completions",
+        verbose_name="Lesson",
+    )
+    date = models.DateField(verbose_name="Date")
+    completions = models.PositiveIntegerField(default=0, verbose_name="Completions")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["lesson", "date"], name="unique_daily_completion_rollup"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["course", "date"], name="completion_course_date_idx"),
+        ]
@@ -0,0 +1,222 @@
+"""
+Write-behind queue for lesson completions.
+
+When ``settings.LESSON_PROGRESS_WRITE_BEHIND`` is enabled the API appends
+completions to a local SQLite append log instead of writing ``LessonProgress``
+rows inside the request. The ``drain_progress_queue`` command applies them
+in batched upserts. Only a single worker should drain a given queue file.
+"""
+
+import functools
+import sqlite3
+import time
+from collections import Counter
+from contextlib import closing
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+User = get_user_model()
+
+
+class ProgressQueue:
+    def __init__(self, path=None):
+        self.path = str(path or settings.LESSON_PROGRESS_QUEUE_PATH)
+        with closing(self.connect()) as connection, connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "user_id INTEGER NOT NULL, "
+                "lesson_id INTEGER NOT NULL, "
+                "created_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS completions_user_idx "
+                "ON completions (user_id)"
+            )
+
+    def connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def append(self, user_id, lesson_ids):
+        now = time.time()
+        with closing(self.connect()) as connection, connection:
+            connection.executemany(
+                "INSERT INTO completions (user_id, lesson_id, created_at) "
+                "VALUES (?, ?, ?)",
+                [(user_id, lesson_id, now) for lesson_id in lesson_ids],
+            )
+
+    def pending_lesson_ids(self, user_id):
+        with closing(self.connect()) as connection:
+            rows = connection.execute(
+                "SELECT DISTINCT lesson_id FROM completions WHERE user_id = ?",
+                [user_id],
+            )
+            return {lesson_id for (lesson_id,) in rows}
+
+    def pending_pairs(self, user_ids=None):
+        """
+        Distinct queued ``(user_id, lesson_id)`` pairs, of every user when
+        ``user_ids`` is ``None``.
+        """
+        query = "SELECT DISTINCT user_id, lesson_id FROM completions"
+        params = []
+        if user_ids is not None:
+            params = list(user_ids)
+            if not params:
+                return set()
+            query += f" WHERE user_id IN ({', '.join('?' * len(params))})"
+        with closing(self.connect()) as connection:
+            return set(connection.execute(query, params))
+
+    def peek(self, batch_size):
+        with closing(self.connect()) as connection:
+            return connection.execute(
+                "SELECT id, user_id, lesson_id FROM completions ORDER BY id LIMIT ?",
+                [batch_size],
+            ).fetchall()
+
+    def ack(self, last_id):
+        with closing(self.connect()) as connection, connection:
+            connection.execute("DELETE FROM completions WHERE id <= ?", [last_id])
+
+    def __len__(self):
+        with closing(self.connect()) as connection:
+            return connection.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+
+
+@functools.lru_cache
+def get_queue_for_path(path):
+    return ProgressQueue(path)
+
+
+def get_progress_queue():
+    return get_queue_for_path(str(settings.LESSON_PROGRESS_QUEUE_PATH))
+
+
+def count_pending_completions(enrollment, queue):
+    """
+    Number of queued completions that will add to the enrollment's
+    ``completed_lessons`` once applied, so readers see their own writes.
+    """
+    from courses.models import Lesson
+
+    from .models import LessonProgress
+
+    lesson_ids = queue.pending_lesson_ids(enrollment.user_id)
+    if not lesson_ids:
+        return 0
+    completed = LessonProgress.objects.filter(
+        user_id=enrollment.user_id, lesson=OuterRef("pk"), completed=True
+    )
+    return (
+        Lesson.objects.filter(
+            pk__in=lesson_ids, course_id=enrollment.course_id, is_active=True
+        )
+        .exclude(Exists(completed))
+        .count()
+    )
+
+
+def count_pending_completions_by_enrollment(queue, user_ids=None):
+    """
+    ``count_pending_completions`` of every enrollment of ``user_ids`` at
+    once, as a ``{(user_id, course_id): count}`` mapping.
+    """
+    from courses.models import Lesson
+
+    from .models import LessonProgress
+
+    pairs = queue.pending_pairs(user_ids)
+    if not pairs:
+        return {}
+    courses = dict(
+        Lesson.objects.filter(
+            pk__in={lesson_id for _, lesson_id in pairs}, is_active=True
+        ).values_list("pk", "course_id")
+    )
+    completed = set(
+        LessonProgress.objects.filter(
+            user_id__in={user_id for user_id, _ in pairs},
+            lesson_id__in=courses,
+            completed=True,
+        ).values_list("user_id", "lesson_id")
+    )
+    return Counter(
+        (user_id, courses[lesson_id])
+        for user_id, lesson_id in pairs
+        if lesson_id in courses and (user_id, lesson_id) not in completed
+    )
+
+
+def apply_completions(pairs):
+    """
+    Upsert completed ``LessonProgress`` rows for ``(user_id, lesson_id)`` pairs
+    and refresh the affected enrollment counters, in a fixed number of
+    queries. Pairs pointing at deleted users or lessons are dropped and
+    already completed ones are left untouched, replays do not bump their
+    ``updated_at`` and with it the daily rollups. Returns the number of rows
+    written.
+    """
+    from courses.models import Lesson
+
+    from .models import Enrollment, LessonProgress
+
+    pairs = set(pairs)
+    user_ids = set(
+        User.objects.filter(pk__in={user_id for user_id, _ in pairs}).values_list(
+            "pk", flat=True
+        )
+    )
+    lessons = dict(
+        Lesson.objects.filter(pk__in={lesson_id for _, lesson_id in pairs})
+        .order_by()
+        .values_list("pk", "course_id")
+    )
+    completed = set(
+        LessonProgress.objects.filter(
+            user_id__in=user_ids, lesson_id__in=lessons, completed=True
+        ).values_list("user_id", "lesson_id")
+    )
+    pairs = [
+        (user_id, lesson_id)
+        for user_id, lesson_id in pairs
+        if user_id in user_ids
+        and lesson_id in lessons
+        and (user_id, lesson_id) not in completed
+    ]
+    if not pairs:
+        return 0
+
+    with transaction.atomic():
+        LessonProgress.objects.bulk_create(
+            [
+                LessonProgress(user_id=user_id, lesson_id=lesson_id, completed=True)
+                for user_id, lesson_id in pairs
+            ],
+            update_conflicts=True,
+            unique_fields=["user", "lesson"],
+            update_fields=["completed", "updated_at"],
+        )
+        Enrollment.objects.filter(
+            user_id__in={user_id for user_id, _ in pairs},
+            course_id__in={lessons[lesson_id] for _, lesson_id in pairs},
+        ).refresh_counters()
+    return len(pairs)
+
+
+def drain(queue, batch_size=500):
+    """
+    Apply one batch from the queue, returns the number of events consumed.
+    """
+    events = queue.peek(batch_size)
+    if not events:
+        return 0
+    apply_completions((user_id, lesson_id) for _, user_id, lesson_id in events)
+    # Acknowledge only after the upsert committed, replays are idempotent.
+    queue.ack(events[-1][0])
+    return len(events)
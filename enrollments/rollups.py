@@ -0,0 +1,232 @@
+"""
+Daily course analytics rollups.
+
+Enrollments are counted per course and day of ``Enrollment.created_at``,
+lesson completions per lesson and day of ``LessonProgress.updated_at``. Every
+source table has a watermark, a run only scans the rows written since it to
+find the courses and lessons to recount, so its cost follows the write
+volume and not the size of the tables.
+
+Deleted enrollments and progress rows do not move a watermark, their days are
+corrected on the next recount of the course or lesson, or by a backfill.
+"""
+
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Exists, Min, OuterRef, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import (
+    DailyEnrollmentRollup,
+    DailyLessonCompletionRollup,
+    Enrollment,
+    LessonProgress,
+    RollupWatermark,
+)
+
+ENROLLMENTS = "enrollments"
+COMPLETIONS = "lesson_completions"
+
+
+def chunked(values, size):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def start_of_day(date):
+    # Same time zone as TruncDate, the current one.
+    return timezone.make_aware(datetime.datetime.combine(date, datetime.time.min))
+
+
+def roll_up_enrollments(since, until, batch_size):
+    """
+    Recount the enrollment days of every course enrolled in since the
+    watermark, from the first new day on. Enrollments never change their
+    ``created_at``, earlier days are final.
+    """
+    changed = Enrollment.objects.filter(created_at__lte=until)
+    if since is not None:
+        changed = changed.filter(created_at__gt=since)
+    first_days = (
+        changed.order_by()
+        .values("course_id")
+        .annotate(first_day=Min(TruncDate("created_at")))
+        .values_list("course_id", "first_day")
+    )
+    courses = 0
+    for batch in chunked(first_days, batch_size):
+        course_ids = [course_id for course_id, _ in batch]
+        first_day = min(day for _, day in batch)
+        counts = (
+            Enrollment.objects.filter(
+                course_id__in=course_ids, created_at__gte=start_of_day(first_day)
+            )
+            .annotate(day=TruncDate("created_at"))
+            .order_by()
+            .values("course_id", "day")
+            .annotate(total=Count("pk"))
+        )
+        DailyEnrollmentRollup.objects.filter(
+            course_id__in=course_ids, date__gte=first_day
+        ).delete()
+        DailyEnrollmentRollup.objects.bulk_create(
+            DailyEnrollmentRollup(
+                course_id=row["course_id"], date=row["day"], enrollments=row["total"]
+            )
+            for row in counts
+        )
+        courses += len(batch)
+    return courses
+
+
+def roll_up_completions(since, until, batch_size):
+    """
+    Recount the completion days of every lesson completed since the
+    watermark. Upserts bump ``updated_at`` of completed rows, so a completion
+    may move to a later day and the whole lesson is recounted. Only
+    completions of students enrolled in the lesson's course are counted.
+    """
+    enrolled = Enrollment.objects.filter(
+        user=OuterRef("user"), course=OuterRef("lesson__course")
+    )
+    changed = LessonProgress.objects.filter(completed=True, updated_at__lte=until)
+    if since is not None:
+        changed = changed.filter(updated_at__gt=since)
+    lesson_ids = changed.order_by().values_list("lesson_id", flat=True).distinct()
+    lessons = 0
+    for batch in chunked(lesson_ids, batch_size):
+        counts = (
+            LessonProgress.objects.filter(
+                Exists(enrolled), lesson_id__in=batch, completed=True
+            )
+            .annotate(day=TruncDate("updated_at"))
+            .order_by()
+            .values("lesson_id", "lesson__course_id", "day")
+            .annotate(total=Count("pk"))
+        )
+        DailyLessonCompletionRollup.objects.filter(lesson_id__in=batch).delete()
+        DailyLessonCompletionRollup.objects.bulk_create(
+            DailyLessonCompletionRollup(
+                course_id=row["lesson__course_id"],
+                lesson_id=row["lesson_id"],
+                date=row["day"],
+                completions=row["total"],
+            )
+            for row in counts
+            if row["lesson__course_id"] is not None
+        )
+        lessons += len(batch)
+    return lessons
+
+
+ROLLUPS = {
+    ENROLLMENTS: roll_up_enrollments,
+    COMPLETIONS: roll_up_completions,
+}
+
+
+@transaction.atomic
+def update_rollups(batch_size=1000):
+    """
+    Advance every rollup to ``ANALYTICS_ROLLUP_LAG`` seconds ago and return
+    how many courses or lessons each one recounted. The watermark rows are
+    locked, concurrent runs wait for each other.
+    """
+    until = timezone.now() - datetime.timedelta(seconds=settings.ANALYTICS_ROLLUP_LAG)
+    RollupWatermark.objects.bulk_create(
+        [RollupWatermark(name=name) for name in ROLLUPS], ignore_conflicts=True
+    )
+    watermarks = RollupWatermark.objects.select_for_update().in_bulk(list(ROLLUPS))
+
+    updated = {}
+    for name, roll_up in ROLLUPS.items():
+        watermark = watermarks[name]
+        if watermark.value is not None and watermark.value >= until:
+            updated[name] = 0
+            continue
+        updated[name] = roll_up(watermark.value, until, batch_size)
+        watermark.value = until
+        watermark.save(update_fields=["value"])
+    return updated
+
+
+@transaction.atomic
+def backfill_rollups(batch_size=1000):
+    """
+    Drop every rollup and rebuild them from the full history.
+    """
+    DailyEnrollmentRollup.objects.all().delete()
+    DailyLessonCompletionRollup.objects.all().delete()
+    RollupWatermark.objects.filter(name__in=ROLLUPS).update(value=None)
+    return update_rollups(batch_size=batch_size)
+
+
+def get_course_analytics(course, start, end):
+    """
+    Completion funnel and daily enrollment and completion curves of the
+    course between ``start`` and ``end``, both inclusive, read from the
+    rollups only.
+    """
+    enrollments = DailyEnrollmentRollup.objects.filter(course=course)
+    completions = DailyLessonCompletionRollup.objects.filter(course=course)
+    totals = enrollments.aggregate(
+        total=Coalesce(Sum("enrollments"), 0),
+        before=Coalesce(Sum("enrollments", filter=Q(date__lt=start)), 0),
+    )
+    completed_lessons = dict(
+        completions.order_by()
+        .values("lesson_id")
+        .annotate(total=Sum("completions"))
+        .values_list("lesson_id", "total")
+    )
+    daily_enrollments = dict(
+        enrollments.filter(date__range=(start, end)).values_list("date", "enrollments")
+    )
+    daily_completions = dict(
+        completions.filter(date__range=(start, end))
+        .order_by()
+        .values("date")
+        .annotate(total=Sum("completions"))
+        .values_list("date", "total")
+    )
+    rolled_up_to = RollupWatermark.objects.filter(name__in=ROLLUPS).aggregate(
+        value=Min("value")
+    )["value"]
+
+    daily = []
+    total_enrollments = totals["before"]
+    for offset in range((end - start).days + 1):
+        date = start + datetime.timedelta(days=offset)
+        total_enrollments += daily_enrollments.get(date, 0)
+        daily.append(
+            {
+                "date": date,
+                "enrollments": daily_enrollments.get(date, 0),
+                "total_enrollments": total_enrollments,
+                "completions": daily_completions.get(date, 0),
+            }
+        )
+
+    lessons = course.lessons.order_by("pk").values_list("pk", "title", "is_active")
+    return {
+        "course_id": course.pk,
+        "enrollments": totals["total"],
+        "rolled_up_to": rolled_up_to,
+        "lessons": [
+            {
+                "lesson_id": lesson_id,
+                "title": title,
+                "is_active": is_active,
+                "completions": completed_lessons.get(lesson_id, 0),
+                "completion_rate": Enrollment.calculate_progress(
+                    completed_lessons.get(lesson_id, 0), totals["total"]
+                ),
+            }
+            for lesson_id, title, is_active in lessons
+        ],
+        "daily": daily,
+    }
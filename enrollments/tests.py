@@ -1,3 +1,182 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import tempfile
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from courses.models import Course, Lesson
+from users.models import User
+
+from .models import LessonProgress
+from .queue import ProgressQueue, apply_completions, drain
+from .rollups import update_rollups
+
+
+class EnrollmentTestCase(APITestCase):
+    def setUp(self):
+        self.instructor = User.objects.create_user(
+            "instructor", password="password", role=User.Role.INSTRUCTOR
+        )
+        self.student = User.objects.create_user(
+            "student", password="password", role=User.Role.STUDENT
+        )
+        self.course = Course.objects.create(
+            title="Course",
+            description="Description",
+            instructor=self.instructor,
+            is_published=True,
+        )
+        self.lesson = Lesson.objects.create(
+            title="Lesson", description="Description", course=self.course
+        )
+        self.enrollment = self.course.create_enrollment(self.student)
+
+
+class EnrollmentExportTests(EnrollmentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.lesson.mark_completed(self.student)
+        self.client.force_authenticate(self.instructor)
+
+    def export(self, export_format, accept):
+        response = self.client.get(
+            f"/api/v1/enrollments/export.{export_format}", HTTP_ACCEPT=accept
+        )
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_export(self):
+        for accept in ("text/csv", "*/*", "application/json"):
+            with self.subTest(accept=accept):
+                header, row = csv.reader(io.StringIO(self.export("csv", accept)))
+                row = dict(zip(header, row))
+                self.assertEqual(row["user_id"], str(self.student.pk))
+                self.assertEqual(row["lesson_id"], str(self.lesson.pk))
+                self.assertEqual(row["lesson_completed"], "True")
+
+    def test_ndjson_export(self):
+        for accept in ("application/x-ndjson", "*/*", "application/json"):
+            with self.subTest(accept=accept):
+                (line,) = self.export("ndjson", accept).splitlines()
+                row = json.loads(line)
+                self.assertEqual(row["user_id"], self.student.pk)
+                self.assertEqual(row["lesson_id"], self.lesson.pk)
+                self.assertIs(row["lesson_completed"], True)
+
+    def test_export_is_denied_to_students(self):
+        self.client.force_authenticate(self.student)
+        response = self.client.get(
+            "/api/v1/enrollments/export.csv", HTTP_ACCEPT="text/csv"
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(ANALYTICS_ROLLUP_LAG=0)
+class CourseAnalyticsTests(EnrollmentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.lesson.mark_completed(self.student)
+        self.url = f"/api/v1/courses/{self.course.pk}/analytics/"
+
+    def test_funnel_counts_enrolled_students_only(self):
+        outsider = User.objects.create_user(
+            "outsider", password="password", role=User.Role.STUDENT
+        )
+        LessonProgress.objects.create(user=outsider, lesson=self.lesson, completed=True)
+        update_rollups()
+
+        self.client.force_authenticate(self.instructor)
+        data = self.client.get(self.url).json()
+        self.assertEqual(data["enrollments"], 1)
+        (lesson,) = data["lessons"]
+        self.assertEqual(lesson["completions"], 1)
+        self.assertEqual(lesson["completion_rate"], 100)
+        self.assertEqual(data["daily"][-1]["completions"], 1)
+
+    @override_settings(QUERY_BUDGET_ENFORCE=True)
+    def test_query_count_with_session_authentication(self):
+        update_rollups()
+        self.client.login(username="instructor", password="password")
+        with self.assertNumQueries(9):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+
+class ProgressQueueTests(EnrollmentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.other_lesson = Lesson.objects.create(
+            title="Other", description="Description", course=self.course
+        )
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = f"{directory.name}/queue.sqlite3"
+        self.queue = ProgressQueue(self.path)
+
+    def test_append_and_pending(self):
+        self.queue.append(self.student.pk, [self.lesson.pk, self.other_lesson.pk])
+        self.queue.append(self.student.pk, [self.lesson.pk])
+        self.queue.append(0, [self.lesson.pk])
+        self.assertEqual(len(self.queue), 4)
+        self.assertEqual(
+            self.queue.pending_lesson_ids(self.student.pk),
+            {self.lesson.pk, self.other_lesson.pk},
+        )
+        self.assertEqual(
+            self.queue.pending_pairs([self.student.pk]),
+            {
+                (self.student.pk, self.lesson.pk),
+                (self.student.pk, self.other_lesson.pk),
+            },
+        )
+        self.assertEqual(len(self.queue.pending_pairs()), 3)
+        self.assertEqual(self.queue.pending_pairs([]), set())
+
+    def test_drain_applies_and_acknowledges_in_batches(self):
+        self.queue.append(self.student.pk, [self.lesson.pk, self.lesson.pk])
+        self.queue.append(self.student.pk, [self.other_lesson.pk])
+        self.assertEqual(drain(self.queue, batch_size=2), 2)
+        self.assertEqual(len(self.queue), 1)
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.completed_lessons, 1)
+
+        self.assertEqual(drain(self.queue, batch_size=2), 1)
+        self.assertEqual(drain(self.queue, batch_size=2), 0)
+        self.assertEqual(len(self.queue), 0)
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.completed_lessons, 2)
+
+    def test_replays_are_idempotent(self):
+        pairs = [(self.student.pk, self.lesson.pk)]
+        self.assertEqual(apply_completions(pairs), 1)
+        progress = LessonProgress.objects.get()
+        # Already completed pairs are not rewritten.
+        with self.assertNumQueries(3):
+            self.assertEqual(apply_completions(pairs), 0)
+        self.assertEqual(LessonProgress.objects.get().updated_at, progress.updated_at)
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.completed_lessons, 1)
+
+    def test_incomplete_rows_are_completed(self):
+        LessonProgress.objects.create(
+            user=self.student, lesson=self.lesson, completed=False
+        )
+        self.assertEqual(apply_completions([(self.student.pk, self.lesson.pk)]), 1)
+        self.assertTrue(LessonProgress.objects.get().completed)
+
+    def test_pairs_of_deleted_rows_are_dropped(self):
+        pairs = [(0, self.lesson.pk), (self.student.pk, 0)]
+        self.assertEqual(apply_completions(pairs), 0)
+        self.assertFalse(LessonProgress.objects.exists())
+
+    def test_drain_command(self):
+        self.queue.append(self.student.pk, [self.lesson.pk])
+        stdout = io.StringIO()
+        with override_settings(LESSON_PROGRESS_QUEUE_PATH=self.path):
+            call_command("drain_progress_queue", "--once", stdout=stdout)
+        self.assertEqual(stdout.getvalue(), "Applied 1 lesson completions.\n")
+        self.assertEqual(len(self.queue), 0)
+        self.assertTrue(LessonProgress.objects.filter(completed=True).exists())
@@ -1,3 +1,11 @@
-from django.urls import path
+from django.urls import re_path
 
-urlpatterns = []
+from .views import EnrollmentExportView
+
+urlpatterns = [
+    re_path(
+        r"^export\.(?P<export_format>csv|ndjson)$",
+        EnrollmentExportView.as_view(),
+        name="enrollment-export",
+    ),
+]
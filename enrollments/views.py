@@ -1,3 +1,44 @@
-from django.shortcuts import render
+from django.http import StreamingHttpResponse
+from rest_framework import permissions, serializers, views
+from rest_framework.exceptions import PermissionDenied
 
-# Create your views here.
+from utils.http import IgnoreClientContentNegotiation
+
+from .exports import RENDERERS, iter_progress_rows
+from .models import Enrollment
+
+
+class EnrollmentExportView(views.APIView):
+    """
+    Stream enrollments with their lesson progress as CSV or NDJSON.
+    Instructors get their own courses, admins every course.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    # The format comes from the URL, CSV and NDJSON clients send Accept
+    # headers no renderer matches.
+    content_negotiation_class = IgnoreClientContentNegotiation
+
+    def get(self, request, export_format):
+        user = request.user
+        if user.is_superuser or user.is_admin:
+            enrollments = Enrollment.objects.all()
+        elif user.is_instructor:
+            enrollments = Enrollment.objects.filter(course__instructor=user)
+        else:
+            raise PermissionDenied
+
+        course_id = request.query_params.get("course")
+        if course_id:
+            if not course_id.isdigit():
+                raise serializers.ValidationError("course must be an integer.")
+            enrollments = enrollments.filter(course_id=course_id)
+
+        content_type, render = RENDERERS[export_format]
+        response = StreamingHttpResponse(
+            render(iter_progress_rows(enrollments)), content_type=content_type
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="enrollments.{export_format}"'
+        )
+        return response
@@ -6,4 +6,8 @@ class UsersConfig(AppConfig):
     name = "users"
 
     def ready(self):
-        import users.signals
+        import users.signals  # noqa: F401
+        from users.cache import collect_metrics
+        from utils.metrics import registry
+
+        registry.register_collector(collect_metrics)
@@ -0,0 +1,59 @@
+from asgiref.sync import sync_to_async
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .cache import user_cache
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` that serves the token's user from the in-process
+    ``user_cache`` and only hits the database on a miss.
+    """
+
+    def get_user_id(self, validated_token):
+        # The claim may be a string, key the cache by the primary key value
+        # the signals invalidate.
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return None
+        return self.user_model._meta.get_field(api_settings.USER_ID_FIELD).to_python(
+            user_id
+        )
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+            return user
+        return self.check_cached_user(user, validated_token)
+
+    async def aget_user(self, validated_token):
+        """
+        Async ``get_user`` for the ASGI views, a cache hit does not leave the
+        event loop.
+        """
+        user_id = self.get_user_id(validated_token)
+        user = user_cache.get(user_id) if user_id is not None else None
+        if user is None:
+            return await sync_to_async(self.get_user)(validated_token)
+        return self.check_cached_user(user, validated_token)
+
+    def check_cached_user(self, user, validated_token):
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+        return user
@@ -0,0 +1,115 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def get_user_version_key(user_id):
+    return f"users:version:{user_id}"
+
+
+def get_user_version(user_id):
+    """
+    Version stamp of a user, shared between processes through the cache
+    framework and bumped whenever the user row changes.
+    """
+    key = get_user_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_user_version(user_id):
+    key = get_user_version_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+class UserCache:
+    """
+    Bounded, thread safe LRU of authenticated users with a short TTL. Entries
+    are only served while the user's version stamp is unchanged.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id):
+        version = get_user_version(user_id)
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None or entry[1] != version or entry[2] < time.monotonic():
+                self.misses += 1
+                return None
+            self.entries.move_to_end(user_id)
+            self.hits += 1
+        # Hand out copies so a request can not mutate the cached instance.
+        return copy.copy(entry[0])
+
+    def set(self, user_id, user):
+        entry = (
+            copy.copy(user),
+            get_user_version(user_id),
+            time.monotonic() + self.ttl,
+        )
+        with self.lock:
+            self.entries[user_id] = entry
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self.entries),
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+user_cache = UserCache(
+    maxsize=settings.AUTH_USER_CACHE_MAXSIZE, ttl=settings.AUTH_USER_CACHE_TTL
+)
+
+
+def collect_metrics():
+    stats = user_cache.stats()
+    return [
+        ("user_cache_hits_total", "counter", "Cached user lookups.", stats["hits"]),
+        (
+            "user_cache_misses_total",
+            "counter",
+            "Uncached user lookups.",
+            stats["misses"],
+        ),
+        ("user_cache_size", "gauge", "Users held in the cache.", stats["size"]),
+        (
+            "user_cache_hit_ratio",
+            "gauge",
+            "Share of user lookups served from the cache.",
+            stats["hit_ratio"],
+        ),
+    ]
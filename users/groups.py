@@ -0,0 +1,50 @@
+from django.contrib.auth.models import Group, Permission
+from django.db import DEFAULT_DB_ALIAS
+
+from .models import User
+
+INSTRUCTOR_GROUP = "Instructor"
+INSTRUCTOR_PERMISSIONS = {
+    "course": ["add_course", "change_course", "view_course"],
+    "lesson": ["add_lesson", "change_lesson", "view_lesson"],
+}
+
+
+def ensure_instructor_group(using=DEFAULT_DB_ALIAS):
+    """
+    Create the Instructor group and grant it its permissions. Runs after
+    every migrate, the course permissions only exist once the courses app
+    has been migrated.
+    """
+    group, _ = Group.objects.using(using).get_or_create(name=INSTRUCTOR_GROUP)
+    permissions = Permission.objects.none()
+    for model, codenames in INSTRUCTOR_PERMISSIONS.items():
+        permissions |= Permission.objects.using(using).filter(
+            content_type__app_label="courses",
+            content_type__model=model,
+            codename__in=codenames,
+        )
+    group.permissions.add(*permissions)
+    return group.pk
+
+
+def add_to_instructor_group(user_ids):
+    """
+    Add users to the Instructor group straight through the m2m table, one
+    INSERT for any number of users.
+    """
+    group_id = (
+        Group.objects.filter(name=INSTRUCTOR_GROUP).values_list("pk", flat=True).first()
+        or ensure_instructor_group()
+    )
+    Membership = User.groups.through
+    Membership.objects.bulk_create(
+        [Membership(user_id=user_id, group_id=group_id) for user_id in user_ids],
+        ignore_conflicts=True,
+    )
+
+
+def remove_from_instructor_group(user_ids):
+    User.groups.through.objects.filter(
+        user_id__in=user_ids, group__name=INSTRUCTOR_GROUP
+    ).delete()
@@ -0,0 +1,194 @@
+import csv
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from users.groups import add_to_instructor_group
+from users.models import User
+
+
+def setup_worker():
+    # Needed when workers are spawned instead of forked.
+    django.setup()
+
+
+def hash_password(args):
+    password, hasher = args
+    return make_password(password or None, hasher=hasher)
+
+
+def read_records(path, file_format):
+    with open(path, newline="", encoding="utf-8") as file:
+        if file_format == "csv":
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class Command(BaseCommand):
+    help = (
+        "Import users from a CSV or JSON lines file with username, email, "
+        "password and role columns."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "jsonl"],
+            help="Input format, guessed from the file extension by default.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Processes used to hash passwords.",
+        )
+        parser.add_argument(
+            "--hasher",
+            default="default",
+            help=(
+                "Password hasher algorithm from PASSWORD_HASHERS. Passwords "
+                "are upgraded to the preferred hasher on the next login."
+            ),
+        )
+        parser.add_argument(
+            "--offset",
+            type=int,
+            default=0,
+            help="Skip this many records, to resume an interrupted import.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or (
+            "csv" if path.lower().endswith(".csv") else "jsonl"
+        )
+        if not os.path.exists(path):
+            raise CommandError(f"{path} does not exist.")
+        try:
+            get_hasher(options["hasher"])
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        records = itertools.islice(
+            read_records(path, file_format), options["offset"], None
+        )
+        offset = options["offset"]
+        created = skipped = 0
+        started = time.monotonic()
+
+        with ProcessPoolExecutor(
+            max_workers=options["workers"], initializer=setup_worker
+        ) as executor:
+            while chunk := list(itertools.islice(records, options["chunk_size"])):
+                chunk_created, chunk_skipped = self.import_chunk(
+                    chunk, offset, executor, options
+                )
+                for index, username, reason in chunk_skipped:
+                    self.stderr.write(
+                        f"Skipped record {index} ({username!r}): {reason}."
+                    )
+                created += chunk_created
+                skipped += len(chunk_skipped)
+                offset += len(chunk)
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f"offset={offset} created={created} skipped={skipped} "
+                    f"rate={created / elapsed:.0f} users/s"
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {created} users, skipped {skipped} "
+                f"in {time.monotonic() - started:.1f}s."
+            )
+        )
+
+    def import_chunk(self, chunk, offset, executor, options):
+        """
+        Insert the new users of a chunk. Returns the number of users created
+        and ``(record index, username, reason)`` for every skipped record.
+        """
+        existing = self.get_existing_usernames(
+            {record.get("username") for record in chunk}
+        )
+        records = {}
+        skipped = []
+        for index, record in enumerate(chunk, offset):
+            username = record.get("username")
+            role = record.get("role") or User.Role.STUDENT
+            if not username:
+                reason = "no username"
+            elif username in existing:
+                reason = "the username exists"
+            elif username in records:
+                reason = "duplicate username"
+            elif role not in User.Role.values:
+                reason = f"unknown role {role!r}"
+            else:
+                records[username] = (index, {**record, "role": role})
+                continue
+            skipped.append((index, username, reason))
+
+        hashes = executor.map(
+            hash_password,
+            [
+                (record.get("password"), options["hasher"])
+                for _, record in records.values()
+            ],
+            chunksize=max(1, len(records) // (options["workers"] * 4)),
+        )
+        users = [
+            User(
+                username=record["username"],
+                email=record.get("email") or "",
+                first_name=record.get("first_name") or "",
+                last_name=record.get("last_name") or "",
+                password=password,
+                role=record["role"],
+                is_staff=record["role"] == User.Role.INSTRUCTOR,
+            )
+            for (_, record), password in zip(records.values(), hashes)
+        ]
+
+        with transaction.atomic():
+            # ignore_conflicts silently drops users another process created
+            # in the meantime, compare the usernames before and after.
+            before = self.get_existing_usernames(records)
+            User.objects.bulk_create(users, ignore_conflicts=True)
+            inserted = self.get_existing_usernames(records) - before
+            # Bulk inserts skip the per-user post_save signals, instructor
+            # group memberships are added in one statement instead.
+            instructors = [
+                user.username
+                for user in users
+                if user.username in inserted and user.role == User.Role.INSTRUCTOR
+            ]
+            if instructors:
+                add_to_instructor_group(
+                    User.objects.filter(username__in=instructors).values_list(
+                        "pk", flat=True
+                    )
+                )
+
+        for username in records.keys() - inserted:
+            skipped.append((records[username][0], username, "the username exists"))
+        return len(inserted), sorted(skipped)
+
+    def get_existing_usernames(self, usernames):
+        return set(
+            User.objects.filter(username__in=usernames).values_list(
+                "username", flat=True
+            )
+        )
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+def create_instructor_group(apps, schema_editor):
+    # The group's permissions are granted by the post_migrate handler in
+    # users.signals, they do not exist before the courses app is migrated.
+    Group = apps.get_model("auth", "Group")
+    User = apps.get_model("users", "User")
+
+    group, _ = Group.objects.get_or_create(name="Instructor")
+    Membership = User.groups.through
+    Membership.objects.bulk_create(
+        [
+            Membership(user_id=user_id, group_id=group.pk)
+            for user_id in User.objects.filter(role="instructor").values_list(
+                "pk", flat=True
+            )
+        ],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_instructor_group, migrations.RunPython.noop),
+    ]
@@ -17,6 +17,15 @@ class User(AbstractUser):
         verbose_name="User Role",
     )
 
+    loaded_role = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Role as stored in the database, lets signals detect role changes.
+        instance.loaded_role = instance.__dict__.get("role")
+        return instance
+
     @property
     def is_admin(self):
         return self.role == self.Role.ADMIN
@@ -26,16 +26,16 @@ class RegisterSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         validated_data.pop("password2")
+        role = validated_data.get("role", User.Role.STUDENT)
+        # Instructors are staff from the start, so the user is saved once.
         user = User.objects.create_user(
             username=validated_data["username"],
             email=validated_data.get("email"),
             password=validated_data["password"],
-            role=validated_data.get("role", User.Role.STUDENT),
+            role=role,
+            is_staff=role == User.Role.INSTRUCTOR,
+            is_active=True,
         )
-        if user.role == User.Role.INSTRUCTOR:
-            user.is_staff = True
-            user.is_active = True
-            user.save()
         return user
 
 
@@ -1,29 +1,37 @@
-from django.contrib.auth.models import Group, Permission
-from django.contrib.contenttypes.models import ContentType
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_migrate, post_save
 from django.dispatch import receiver
 
-from courses.models import Course, Lesson
-
+from .cache import bump_user_version, user_cache
+from .groups import (
+    add_to_instructor_group,
+    ensure_instructor_group,
+    remove_from_instructor_group,
+)
 from .models import User
 
 
 @receiver(post_save, sender=User)
 def assign_instructor_permissions(sender, instance, created, **kwargs):
-    if instance.role == User.Role.INSTRUCTOR:
-        instructor_group, _ = Group.objects.get_or_create(name="Instructor")
+    # Only act when the role changes, not on every save.
+    is_instructor = instance.role == User.Role.INSTRUCTOR
+    was_instructor = not created and instance.loaded_role == User.Role.INSTRUCTOR
+    if is_instructor and not was_instructor:
+        add_to_instructor_group([instance.pk])
+    elif was_instructor and not is_instructor:
+        remove_from_instructor_group([instance.pk])
+    instance.loaded_role = instance.role
+
 
-        if instructor_group.permissions.count() == 0:
-            course_ct = ContentType.objects.get_for_model(Course)
-            lesson_ct = ContentType.objects.get_for_model(Lesson)
-            perms = Permission.objects.filter(content_type=course_ct).filter(
-                codename__in=["add_course", "change_course", "view_course"]
-            )
-            lesson_perms = Permission.objects.filter(content_type=lesson_ct).filter(
-                codename__in=["add_lesson", "change_lesson", "view_lesson"]
-            )
+@receiver(post_migrate)
+def provision_instructor_group(sender, using, **kwargs):
+    # post_migrate is sent per app, the course permissions are created on
+    # the courses one.
+    if sender.label == "courses":
+        ensure_instructor_group(using)
 
-            instructor_group.permissions.add(*perms, *lesson_perms)
 
-        if not instance.groups.filter(name="Instructor").exists():
-            instance.groups.add(instructor_group)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    bump_user_version(instance.pk)
+    user_cache.invalidate(instance.pk)
@@ -1,3 +1,276 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+
+from utils.metrics import registry
+
+from .cache import UserCache, user_cache
+from .groups import INSTRUCTOR_GROUP, INSTRUCTOR_PERMISSIONS
+from .management.commands.import_users import Command
+from .models import User
+
+
+class UserCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.user = User.objects.create_user(
+            "student", password="password", role=User.Role.STUDENT
+        )
+
+    def test_hits_and_misses(self):
+        self.assertIsNone(user_cache.get(self.user.pk))
+        user_cache.set(self.user.pk, self.user)
+        cached = user_cache.get(self.user.pk)
+        self.assertEqual(cached, self.user)
+        # Every hit is a copy, requests can not change the cached instance.
+        self.assertIsNot(cached, self.user)
+        self.assertIsNot(user_cache.get(self.user.pk), cached)
+        self.assertEqual(
+            user_cache.stats(), {"hits": 2, "misses": 1, "size": 1, "hit_ratio": 2 / 3}
+        )
+
+    def test_entries_expire_after_the_ttl(self):
+        users = UserCache(maxsize=10, ttl=30)
+        with mock.patch("users.cache.time.monotonic", return_value=100.0):
+            users.set(self.user.pk, self.user)
+        with mock.patch("users.cache.time.monotonic", return_value=129.0):
+            self.assertIsNotNone(users.get(self.user.pk))
+        with mock.patch("users.cache.time.monotonic", return_value=131.0):
+            self.assertIsNone(users.get(self.user.pk))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        users = UserCache(maxsize=2, ttl=30)
+        others = [
+            User.objects.create_user(f"other{index}", password="password")
+            for index in range(2)
+        ]
+        users.set(self.user.pk, self.user)
+        users.set(others[0].pk, others[0])
+        users.get(self.user.pk)
+        users.set(others[1].pk, others[1])
+        self.assertIsNotNone(users.get(self.user.pk))
+        self.assertIsNone(users.get(others[0].pk))
+        self.assertIsNotNone(users.get(others[1].pk))
+
+    def test_saving_a_user_invalidates_it(self):
+        user_cache.set(self.user.pk, self.user)
+        self.user.role = User.Role.INSTRUCTOR
+        self.user.save()
+        self.assertIsNone(user_cache.get(self.user.pk))
+
+    def test_a_version_bump_from_another_process_invalidates_it(self):
+        user_cache.set(self.user.pk, self.user)
+        # Another process saved the user, this one only sees the new stamp.
+        with mock.patch.object(user_cache, "invalidate"):
+            User.objects.get(pk=self.user.pk).save()
+        self.assertIn(self.user.pk, user_cache.entries)
+        self.assertIsNone(user_cache.get(self.user.pk))
+
+    def test_metrics(self):
+        user_cache.get(self.user.pk)
+        user_cache.set(self.user.pk, self.user)
+        user_cache.get(self.user.pk)
+        metrics = registry.render()
+        self.assertIn("elearning_user_cache_hits_total 1\n", metrics)
+        self.assertIn("elearning_user_cache_misses_total 1\n", metrics)
+        self.assertIn("elearning_user_cache_size 1\n", metrics)
+        self.assertIn("elearning_user_cache_hit_ratio 0.5\n", metrics)
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    url = "/api/v1/courses/"
+
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.user = User.objects.create_user(
+            "student", password="password", role=User.Role.STUDENT
+        )
+
+    def get(self, user=None):
+        token = AccessToken.for_user(user or self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                self.url, headers={"Authorization": f"Bearer {token}"}
+            )
+        user_queries = [q for q in queries if 'FROM "users_user"' in q["sql"]]
+        return response, len(user_queries)
+
+    def test_user_is_loaded_once(self):
+        response, user_queries = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(user_queries, 1)
+        response, user_queries = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(user_queries, 0)
+        self.assertEqual(user_cache.stats()["hits"], 1)
+
+    def test_changes_are_seen_on_the_next_request(self):
+        self.get()
+        self.user.is_active = False
+        self.user.save()
+        response, user_queries = self.get()
+        self.assertEqual(response.json()["code"], "user_inactive")
+        self.assertEqual(user_queries, 1)
+
+    def test_cached_user_is_checked(self):
+        self.get()
+        self.assertEqual(list(user_cache.entries), [self.user.pk])
+        self.user.is_active = False
+        user_cache.set(self.user.pk, self.user)
+        response, user_queries = self.get()
+        self.assertEqual(response.json()["code"], "user_inactive")
+        self.assertEqual(user_queries, 0)
+
+
+class InstructorGroupTests(TestCase):
+    def get_perms(self, user):
+        # Fresh instance, permissions are cached on the user.
+        return User.objects.get(pk=user.pk).get_all_permissions()
+
+    def test_group_is_provisioned_by_migrate(self):
+        group = Group.objects.get(name=INSTRUCTOR_GROUP)
+        self.assertEqual(
+            set(group.permissions.values_list("codename", flat=True)),
+            {
+                codename
+                for codenames in INSTRUCTOR_PERMISSIONS.values()
+                for codename in codenames
+            },
+        )
+
+    def test_membership_follows_the_role(self):
+        user = User.objects.create_user("user", role=User.Role.STUDENT)
+        self.assertEqual(self.get_perms(user), set())
+
+        user.role = User.Role.INSTRUCTOR
+        user.save()
+        self.assertIn("courses.add_course", self.get_perms(user))
+
+        user = User.objects.get(pk=user.pk)
+        user.role = User.Role.STUDENT
+        user.save()
+        self.assertEqual(self.get_perms(user), set())
+        self.assertFalse(user.groups.exists())
+
+    def test_created_instructors_join_the_group(self):
+        user = User.objects.create_user("user", role=User.Role.INSTRUCTOR)
+        self.assertEqual(
+            list(user.groups.values_list("name", flat=True)), [INSTRUCTOR_GROUP]
+        )
+        # Saves that keep the role do not touch the membership.
+        with CaptureQueriesContext(connection) as queries:
+            user.save(update_fields=["first_name"])
+        self.assertFalse([q for q in queries if "users_user_groups" in q["sql"]])
+
+
+class ImportUsersTests(TestCase):
+    rows = [
+        {"username": "alice", "password": "secret", "role": "student"},
+        {"username": "bob", "email": "bob@example.com", "role": "instructor"},
+        {"username": "", "role": "student"},
+        {"username": "dave", "role": "student"},
+        {"username": "erin", "role": "wizard"},
+        {"username": "alice", "role": "instructor"},
+        {"username": "frank"},
+    ]
+
+    def setUp(self):
+        self.dave = User.objects.create_user("dave", role=User.Role.INSTRUCTOR)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name, rows):
+        path = os.path.join(self.directory, name)
+        with open(path, "w", newline="", encoding="utf-8") as file:
+            if name.endswith(".csv"):
+                writer = csv.DictWriter(file, ["username", "email", "password", "role"])
+                writer.writeheader()
+                writer.writerows(rows)
+            else:
+                file.writelines(json.dumps(row) + "\n" for row in rows)
+        return path
+
+    def call(self, path, *args):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command(
+            "import_users", path, "--workers=1", *args, stdout=stdout, stderr=stderr
+        )
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import(self):
+        for name in ("users.csv", "users.jsonl"):
+            with self.subTest(name), transaction.atomic():
+                stdout, stderr = self.call(
+                    self.write(name, self.rows), "--chunk-size=4"
+                )
+                self.assertIn("Imported 3 users, skipped 4", stdout)
+                self.assertEqual(
+                    stderr.splitlines(),
+                    [
+                        "Skipped record 2 (''): no username.",
+                        "Skipped record 3 ('dave'): the username exists.",
+                        "Skipped record 4 ('erin'): unknown role 'wizard'.",
+                        "Skipped record 5 ('alice'): the username exists.",
+                    ],
+                )
+                alice = User.objects.get(username="alice")
+                self.assertTrue(alice.check_password("secret"))
+                self.assertEqual(alice.role, User.Role.STUDENT)
+                bob = User.objects.get(username="bob")
+                self.assertEqual(bob.email, "bob@example.com")
+                self.assertTrue(bob.is_staff)
+                self.assertTrue(bob.groups.filter(name=INSTRUCTOR_GROUP).exists())
+                self.assertEqual(
+                    User.objects.get(username="frank").role, User.Role.STUDENT
+                )
+                transaction.set_rollback(True)
+
+    def test_duplicates_within_a_chunk(self):
+        stdout, stderr = self.call(self.write("users.csv", self.rows))
+        self.assertIn("Imported 3 users, skipped 4", stdout)
+        self.assertIn("Skipped record 5 ('alice'): duplicate username.", stderr)
+
+    def test_offset_resumes_an_import(self):
+        stdout, _ = self.call(self.write("users.csv", self.rows), "--offset=5")
+        self.assertIn("Imported 2 users, skipped 0", stdout)
+        self.assertEqual(
+            set(User.objects.values_list("username", flat=True)),
+            {"dave", "alice", "frank"},
+        )
+
+    def test_users_created_concurrently_are_not_counted(self):
+        get_existing_usernames = Command.get_existing_usernames
+        calls = []
+
+        def create_bob_meanwhile(command, usernames):
+            calls.append(usernames)
+            if len(calls) == 2:
+                # Created by another process while the passwords were hashed.
+                User.objects.create_user("bob", role=User.Role.STUDENT)
+            return get_existing_usernames(command, usernames)
+
+        path = self.write("users.csv", self.rows[:2])
+        with mock.patch.object(Command, "get_existing_usernames", create_bob_meanwhile):
+            stdout, stderr = self.call(path)
+        self.assertIn("Imported 1 users, skipped 1", stdout)
+        self.assertIn("Skipped record 1 ('bob'): the username exists.", stderr)
+        # The other user is not made an instructor by the import.
+        self.assertFalse(User.objects.get(username="bob").groups.exists())
 
-# Create your tests here.
+    def test_missing_file(self):
+        with self.assertRaisesMessage(CommandError, "does not exist"):
+            self.call(os.path.join(self.directory, "missing.csv"))
@@ -0,0 +1,87 @@
+import hashlib
+from datetime import datetime
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+class ConditionalMixin:
+    """
+    ETag and Last-Modified validators for read actions, derived from
+    ``MAX(updated_at)`` and row counts instead of the rendered body, so a
+    matching ``If-None-Match`` is answered with 304 before any serializer work.
+    Deleting a row does not move ``MAX(updated_at)``, hence only the ETag,
+    which also covers the counts, decides whether a request is fresh, and
+    responses carry ``Cache-Control: private, no-cache`` so clients revalidate
+    every time instead of caching heuristically from Last-Modified.
+    """
+
+    conditional_actions = ("list", "retrieve")
+    validators = None
+
+    def get_validator_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == "retrieve":
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        return queryset
+
+    def get_validator_aggregates(self, queryset):
+        return queryset.aggregate(last_modified=Max("updated_at"), count=Count("pk"))
+
+    def get_etag_parts(self):
+        """
+        Request dependent parts of the ETag besides the aggregates.
+        """
+        request = self.request
+        return (
+            request.get_full_path(),
+            request.accepted_renderer.format,
+            request.user.pk,
+        )
+
+    def get_validators(self):
+        """
+        ``(etag, last_modified)`` of the current request, ``None`` when the
+        request should not be answered conditionally.
+        """
+        aggregates = self.get_validator_aggregates(self.get_validator_queryset())
+        if self.action == "retrieve" and not aggregates["count"]:
+            # Let the regular path answer with 404.
+            return None
+        parts = (*self.get_etag_parts(), *sorted(aggregates.items()))
+        digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False)
+        last_modified = max(
+            (value for value in aggregates.values() if isinstance(value, datetime)),
+            default=None,
+        )
+        return f'W/"{digest.hexdigest()}"', last_modified
+
+    def get_not_modified_response(self, request):
+        """
+        304 response when the client copy is still fresh, ``None`` otherwise.
+        """
+        if self.action not in self.conditional_actions:
+            return None
+        if request.method not in ("GET", "HEAD"):
+            return None
+        self.validators = self.get_validators()
+        if self.validators is None:
+            return None
+        return get_conditional_response(request, etag=self.validators[0])
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.validators is None or response.status_code not in (200, 304):
+            return response
+        patch_cache_control(response, private=True, no_cache=True)
+        etag, last_modified = self.validators
+        response.headers.setdefault("ETag", etag)
+        if last_modified is not None:
+            response.headers.setdefault(
+                "Last-Modified", http_date(last_modified.timestamp())
+            )
+        return response
@@ -0,0 +1,87 @@
+import re
+
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from rest_framework.negotiation import BaseContentNegotiation
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class IgnoreClientContentNegotiation(BaseContentNegotiation):
+    """
+    For views answering with raw bodies, errors use the first renderer
+    whatever the client accepts.
+    """
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def parse_range(header, size):
+    """
+    Inclusive ``(start, end)`` of a single range ``Range`` header, ``None``
+    when the header is missing or ignored. Multiple ranges are ignored, the
+    whole body is sent instead.
+    """
+    match = RANGE_RE.match(header or "")
+    if match is None:
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            # Syntactically invalid, the header is ignored.
+            return None
+        if start >= size:
+            raise RangeNotSatisfiable
+        return start, end
+    if last:
+        suffix = int(last)
+        if not suffix or not size:
+            raise RangeNotSatisfiable
+        return max(size - suffix, 0), size - 1
+    return None
+
+
+def get_body_response(request, etag, data, content_type):
+    size = len(data)
+    byte_range = None
+    # A stale If-Range validator asks for the whole body.
+    if request.headers.get("If-Range", etag) == etag:
+        try:
+            byte_range = parse_range(request.headers.get("Range"), size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+    if byte_range is None:
+        return HttpResponse(data, content_type=content_type)
+
+    start, end = byte_range
+    response = HttpResponse(
+        data[start : end + 1], status=206, content_type=content_type
+    )
+    response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return response
+
+
+def ranged_response(request, etag, load, content_type):
+    """
+    Serve the bytes returned by ``load`` with a strong ``etag``, honouring
+    ``If-None-Match`` and single ``Range`` requests. ``load`` is only called
+    when a body is sent.
+    """
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = get_body_response(request, etag, load(), content_type)
+    response["ETag"] = etag
+    response["Accept-Ranges"] = "bytes"
+    return response
@@ -0,0 +1,287 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import Http404, HttpResponse
+from rest_framework.serializers import BaseSerializer
+
+logger = logging.getLogger(__name__)
+
+current_request_metrics = ContextVar("current_request_metrics", default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Called by ``record_query`` for the request in the current context.
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+
+@contextmanager
+def serializer_timer():
+    """
+    Add the time spent in the block to the serializer time of the current
+    request. Nested blocks, e.g. nested serializers, are counted once.
+    """
+    metrics = current_request_metrics.get()
+    if metrics is None:
+        yield
+        return
+    metrics.serializer_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_depth -= 1
+        if not metrics.serializer_depth:
+            metrics.serializer_time += time.perf_counter() - started
+
+
+def timed_data(fget):
+    def data(serializer):
+        with serializer_timer():
+            return fget(serializer)
+
+    data.is_timed = True
+    return property(data)
+
+
+def install_serializer_timer():
+    if not getattr(BaseSerializer.data.fget, "is_timed", False):
+        BaseSerializer.data = timed_data(BaseSerializer.data.fget)
+
+
+class MetricsRegistry:
+    """
+    Per-process request metrics, rendered in the Prometheus text format.
+    Every worker process keeps its own numbers, scrape each one.
+    """
+
+    series = (
+        ("duration_seconds", "Total request latency in seconds."),
+        ("queries", "Database queries per request."),
+        ("db_seconds", "Time spent in database queries per request in seconds."),
+        ("serializer_seconds", "Time spent serializing per request in seconds."),
+    )
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+        self.budget_exceeded = {}
+        self.collectors = []
+
+    def observe(self, endpoint, **values):
+        with self.lock:
+            totals = self.endpoints.setdefault(
+                endpoint, dict.fromkeys(["count", *dict(self.series)], 0)
+            )
+            totals["count"] += 1
+            for name, value in values.items():
+                totals[name] += value
+
+    def exceeded(self, endpoint):
+        with self.lock:
+            self.budget_exceeded[endpoint] = self.budget_exceeded.get(endpoint, 0) + 1
+
+    def register_collector(self, collector):
+        """
+        ``collector`` returns ``(name, type, help, value)`` tuples that are
+        exported next to the request metrics.
+        """
+        self.collectors.append(collector)
+
+    def clear(self):
+        with self.lock:
+            self.endpoints.clear()
+            self.budget_exceeded.clear()
+
+    def render(self):
+        with self.lock:
+            endpoints = {key: dict(value) for key, value in self.endpoints.items()}
+            budget_exceeded = dict(self.budget_exceeded)
+
+        lines = []
+        for name, help_text in self.series:
+            metric = f"elearning_request_{name}"
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} summary"]
+            for endpoint, totals in sorted(endpoints.items()):
+                labels = format_labels(endpoint)
+                lines.append(f"{metric}_count{{{labels}}} {totals['count']}")
+                lines.append(f"{metric}_sum{{{labels}}} {totals[name]}")
+
+        metric = "elearning_query_budget_exceeded_total"
+        lines += [
+            f"# HELP {metric} Requests that ran more queries than their budget.",
+            f"# TYPE {metric} counter",
+        ]
+        for endpoint, value in sorted(budget_exceeded.items()):
+            lines.append(f"{metric}{{{format_labels(endpoint)}}} {value}")
+
+        for collector in self.collectors:
+            for name, metric_type, help_text, value in collector():
+                metric = f"elearning_{name}"
+                lines += [
+                    f"# HELP {metric} {help_text}",
+                    f"# TYPE {metric} {metric_type}",
+                    f"{metric} {value}",
+                ]
+        return "\n".join(lines) + "\n"
+
+
+def escape_label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(endpoint):
+    view, action = endpoint
+    return f'view="{escape_label(view)}",action="{escape_label(action)}"'
+
+
+registry = MetricsRegistry()
+
+
+def resolve_endpoint(request):
+    """
+    Resolver match and action of the request, e.g. ``get_progress`` for
+    ``course-get-progress``. Plain views use the lowercased method as action.
+    """
+    match = request.resolver_match
+    if match is None:
+        return None, None
+    method = request.method.lower()
+    actions = getattr(match.func, "actions", None) or {}
+    return match, actions.get(method, method)
+
+
+def get_query_budget(match, action):
+    """
+    Budgets are declared on the view class, ``query_budgets = {"list": 4}``,
+    or in ``settings.QUERY_BUDGETS`` keyed by view name and action, e.g.
+    ``{"course-get-progress": 3, "course-list:list": 4}``.
+    """
+    budgets = settings.QUERY_BUDGETS
+    budget = budgets.get(f"{match.view_name}:{action}", budgets.get(match.view_name))
+    if budget is not None:
+        return budget
+    view_class = getattr(match.func, "cls", getattr(match.func, "view_class", None))
+    return getattr(view_class, "query_budgets", {}).get(action)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Execute wrapper installed on every connection, counts the query for the
+    request in the current context. Async views run their queries in a
+    worker thread with a copy of that context, so they are counted too.
+    """
+    metrics = current_request_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class InstrumentationMiddleware:
+    """
+    Records query count, DB time, serializer time and total latency of every
+    resolved request, and checks them against the endpoint query budget.
+    With ``QUERY_BUDGET_ENFORCE`` an exceeded budget raises, so tests fail.
+    Runs natively under both WSGI and ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        install_serializer_timer()
+        # Connections opened later get it from ``connection_created``.
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = current_request_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request_metrics.reset(token)
+        self.record(request, metrics, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current_request_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request_metrics.reset(token)
+        self.record(request, metrics, time.perf_counter() - started)
+        return response
+
+    def record(self, request, metrics, duration):
+        match, action = resolve_endpoint(request)
+        if match is None or match.view_name == "metrics":
+            return
+
+        endpoint = (match.view_name, action)
+        registry.observe(
+            endpoint,
+            duration_seconds=duration,
+            queries=metrics.queries,
+            db_seconds=metrics.db_time,
+            serializer_seconds=metrics.serializer_time,
+        )
+
+        budget = get_query_budget(match, action)
+        if budget is not None and metrics.queries > budget:
+            registry.exceeded(endpoint)
+            message = (
+                f"{match.view_name} ({action}) ran {metrics.queries} queries, "
+                f"the budget is {budget}."
+            )
+            if settings.QUERY_BUDGET_ENFORCE:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint, only served to ``INTERNAL_IPS``.
+    """
+    if request.META.get("REMOTE_ADDR") not in settings.INTERNAL_IPS:
+        raise Http404
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,204 @@
+import datetime
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+
+
+class LimitOffsetPagination(pagination.LimitOffsetPagination):
+    """
+    Limit/offset pagination that skips the ``COUNT(*)`` when the client
+    passes ``?count=false``. One extra row is fetched instead to tell
+    whether there is a next page.
+    """
+
+    count_query_param = "count"
+
+    def should_count(self, request):
+        value = request.query_params.get(self.count_query_param, "")
+        return value.lower() not in ("false", "0")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.should_count(request):
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count = None
+        self.offset = self.get_offset(request)
+        results = list(queryset[self.offset : self.offset + self.limit + 1])
+        self.has_next = len(results) > self.limit
+        return results[: self.limit]
+
+    def get_next_link(self):
+        if self.count is None and not self.has_next:
+            return None
+        if self.count is None:
+            url = self.request.build_absolute_uri()
+            url = pagination.replace_query_param(
+                url, self.limit_query_param, self.limit
+            )
+            offset = self.offset + self.limit
+            return pagination.replace_query_param(url, self.offset_query_param, offset)
+        return super().get_next_link()
+
+
+class KeysetPagination(pagination.CursorPagination):
+    """
+    Keyset pagination on the ``(created_at, id)`` tuple, every page costs the
+    same index range scan no matter how deep it is and no count is issued.
+
+    The cursor position holds both columns. The tuple is unique, so unlike
+    DRF's position on the first ordering field plus an offset, rows sharing
+    a timestamp are never skipped or repeated.
+    """
+
+    ordering = ("created_at", "id")
+    page_size_query_param = "limit"
+    max_page_size = 1000
+
+    def get_ordering(self, request, queryset, view):
+        # The cursor compares on these two columns, it can not follow any
+        # other ordering.
+        return self.ordering
+
+    def decode_position(self, position):
+        try:
+            created_at, pk = position.rsplit(",", 1)
+            return datetime.datetime.fromisoformat(created_at), int(pk)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def _get_position_from_instance(self, instance, ordering):
+        if isinstance(instance, dict):
+            created_at, pk = instance["created_at"], instance["id"]
+        else:
+            created_at, pk = instance.created_at, instance.pk
+        return f"{created_at.isoformat()},{pk}"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        current_position = None if self.cursor is None else self.cursor.position
+
+        queryset = self.get_page_queryset(queryset, current_position, reverse)
+        # One extra row tells whether there is a following page.
+        results = list(queryset[: self.page_size + 1])
+        self.page = results[: self.page_size]
+        has_following_page = len(results) > len(self.page)
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None
+            self.has_previous = has_following_page
+        else:
+            self.has_next = has_following_page
+            self.has_previous = current_position is not None
+        self.current_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_page_queryset(self, queryset, position, reverse):
+        """
+        Rows after ``position``, or before it when ``reverse``, in page order.
+        """
+        if reverse:
+            queryset = queryset.order_by("-created_at", "-id")
+        else:
+            queryset = queryset.order_by("created_at", "id")
+        if position is None:
+            return queryset
+
+        created_at, pk = self.decode_position(position)
+        lookup = "lt" if reverse else "gt"
+        # (created_at, id) > (ts, pk), spelled with a bound on created_at
+        # alone so the index range scan starts at the cursor.
+        return queryset.filter(
+            Q(**{f"created_at__{lookup}e": created_at}),
+            Q(**{f"created_at__{lookup}": created_at}) | Q(**{f"id__{lookup}": pk}),
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        position = self.current_position
+        if self.page:
+            position = self._get_position_from_instance(self.page[-1], self.ordering)
+        cursor = pagination.Cursor(offset=0, reverse=False, position=position)
+        return self.encode_cursor(cursor)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self.current_position
+        if self.page:
+            position = self._get_position_from_instance(self.page[0], self.ordering)
+        cursor = pagination.Cursor(offset=0, reverse=True, position=position)
+        return self.encode_cursor(cursor)
+
+
+class KeysetPaginationMixin:
+    """
+    Switch a viewset to keyset pagination when the client asks for it with
+    ``?pagination=keyset`` or follows a ``?cursor=`` link.
+    """
+
+    keyset_pagination_class = KeysetPagination
+
+    def use_keyset_pagination(self):
+        query_params = self.request.query_params
+        return (
+            self.keyset_pagination_class.cursor_query_param in query_params
+            or query_params.get("pagination") == "keyset"
+        )
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            if self.pagination_class is None:
+                self._paginator = None
+            elif self.request is not None and self.use_keyset_pagination():
+                self._paginator = self.keyset_pagination_class()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Django paginator for admin changelists of huge tables. Unfiltered
+    querysets on PostgreSQL use the planner row estimate instead of a
+    ``COUNT(*)`` over the whole table, filtered ones are counted exactly.
+    """
+
+    # Small tables are counted exactly, the estimate lags behind ANALYZE.
+    estimate_threshold = 100_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if connections[queryset.db].vendor == "postgresql" and not queryset.query.where:
+            with connections[queryset.db].cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] > self.estimate_threshold:
+                return int(row[0])
+        return super().count
@@ -0,0 +1,75 @@
+import codecs
+import csv
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def loads(data):
+    """
+    Decode a JSON document with orjson when it is installed.
+    """
+    if orjson is None:
+        return json.loads(data)
+    return orjson.loads(data)
+
+
+class CSVParser(BaseParser):
+    """
+    Parses a CSV body with a header row into a list of dicts.
+    """
+
+    media_type = "text/csv"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            reader = csv.DictReader(codecs.getreader(encoding)(stream))
+            return list(reader)
+        except (csv.Error, ValueError) as exc:
+            raise ParseError(f"CSV parse error - {exc}")
+
+
+class JSONLinesParser(BaseParser):
+    """
+    Parses a JSON lines (NDJSON) body into a list, one item per line.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            return [
+                loads(line)
+                for line in codecs.getreader(encoding)(stream)
+                if line.strip()
+            ]
+        except ValueError as exc:
+            raise ParseError(f"JSON lines parse error - {exc}")
+
+
+class ORJSONParser(JSONParser):
+    """
+    ``JSONParser`` backed by orjson when it is installed. orjson only reads
+    UTF-8, other charsets use the stdlib parser.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
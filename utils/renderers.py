@@ -0,0 +1,55 @@
+from itertools import islice
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` backed by orjson when it is installed. Values orjson can
+    not encode natively (Decimal, lazy strings, querysets, ...) go through
+    DRF's encoder, so the output matches the stdlib renderer. Indented
+    responses, e.g. for the browsable API, data orjson rejects, such as
+    integers wider than 64 bits, and a missing orjson fall back to the stdlib
+    renderer.
+    """
+
+    options = 0 if orjson is None else orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=JSONEncoder().default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping as JSONRenderer, these break JavaScript string literals.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+def stream_json_array(items, chunk_size=1000):
+    """
+    Encode the ``items`` iterable as one JSON array, ``chunk_size`` items at
+    a time, with the same bytes as ``ORJSONRenderer`` rendering the list.
+    """
+    items = iter(items)
+    renderer = ORJSONRenderer()
+    separator = b"["
+    for chunk in iter(lambda: list(islice(items, chunk_size)), []):
+        yield separator + renderer.render(chunk)[1:-1]
+        separator = b","
+    yield b"[]" if separator == b"[" else b"]"
@@ -0,0 +1,189 @@
+from functools import lru_cache
+from operator import itemgetter
+
+from django.db.models import Value
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from utils.metrics import serializer_timer
+
+
+def compile_fields(fields):
+    """
+    Turn a ``{output key: values() path}`` mapping, nested dicts included,
+    into a function rendering one ``values()`` row.
+    """
+    accessors = [
+        (key, compile_fields(path) if isinstance(path, dict) else itemgetter(path))
+        for key, path in fields.items()
+    ]
+
+    def render(row):
+        return {key: accessor(row) for key, accessor in accessors}
+
+    return render
+
+
+def get_paths(fields):
+    for path in fields.values():
+        if isinstance(path, dict):
+            yield from get_paths(path)
+        else:
+            yield path
+
+
+class ValuesSerializer:
+    """
+    Read only fast path for list endpoints. Rows are fetched with
+    ``QuerySet.values()`` and rendered by accessors compiled once per class,
+    skipping model instances and the DRF field machinery. ``fields`` must
+    produce the same output as the matching ``ModelSerializer``.
+    """
+
+    fields = {}
+    # Annotations that may be missing from the queryset and their fallback.
+    defaults = {}
+    # Extra columns needed by pagination but not rendered.
+    extra_paths = ("created_at", "id")
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.paths = tuple(dict.fromkeys((*get_paths(cls.fields), *cls.extra_paths)))
+        cls.render = staticmethod(compile_fields(cls.fields))
+
+    @classmethod
+    @lru_cache(maxsize=128)
+    def prune(cls, fieldset):
+        """
+        Subclass rendering only the ``fieldset`` keys, the other columns are
+        not selected at all.
+        """
+        fields = {key: path for key, path in cls.fields.items() if key in fieldset}
+        return type(cls.__name__, (cls,), {"fields": fields})
+
+    @classmethod
+    def prepare(cls, queryset):
+        missing = {
+            path: Value(default)
+            for path, default in cls.defaults.items()
+            if path in cls.paths and path not in queryset.query.annotations
+        }
+        if missing:
+            queryset = queryset.annotate(**missing)
+        return queryset.values(*cls.paths)
+
+
+class ValuesListMixin:
+    """
+    Serve ``list`` through ``values_serializer_class`` when it is set.
+    """
+
+    values_serializer_class = None
+
+    def get_values_serializer_class(self):
+        return self.values_serializer_class
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_values_serializer_class()
+        if serializer is None:
+            return super().list(request, *args, **kwargs)
+        return self.list_values(self.filter_queryset(self.get_queryset()), serializer)
+
+    def list_values(self, queryset, serializer):
+        """
+        Paginated response of ``queryset`` rendered by the values
+        ``serializer``.
+        """
+        queryset = serializer.prepare(queryset)
+        page = self.paginate_queryset(queryset)
+        with serializer_timer():
+            data = [
+                serializer.render(row) for row in (queryset if page is None else page)
+            ]
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
+def split_param(value):
+    if value is None:
+        return None
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+class SparseFieldsMixin:
+    """
+    ``?fields=`` and ``?omit=`` for read actions, both take comma separated
+    top level field names. Unrequested fields are dropped from the serializer
+    and their columns are deferred, or not selected on the ``values()`` path.
+    """
+
+    sparse_actions = ("list", "retrieve")
+    fields_query_param = "fields"
+    omit_query_param = "omit"
+
+    def get_fieldset(self):
+        """
+        Tuple of the requested field names, ``None`` when every field is.
+        """
+        if hasattr(self, "_fieldset"):
+            return self._fieldset
+        self._fieldset = None
+        if self.action not in self.sparse_actions:
+            return None
+        params = self.request.query_params
+        fields = split_param(params.get(self.fields_query_param))
+        omit = split_param(params.get(self.omit_query_param))
+        if fields is None and omit is None:
+            return None
+
+        available = list(self.get_serializer_class()().fields)
+        unknown = [
+            name for name in (fields or []) + (omit or []) if name not in available
+        ]
+        if unknown:
+            raise serializers.ValidationError(
+                {"fields": f"Unknown field(s): {', '.join(unknown)}."}
+            )
+        self._fieldset = tuple(
+            name
+            for name in available
+            if (fields is None or name in fields) and name not in (omit or ())
+        )
+        return self._fieldset
+
+    def is_field_requested(self, name):
+        fieldset = self.get_fieldset()
+        return fieldset is None or name in fieldset
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fieldset = self.get_fieldset()
+        if fieldset is not None:
+            fields = getattr(serializer, "child", serializer).fields
+            for name in set(fields) - set(fieldset):
+                fields.pop(name)
+        return serializer
+
+    def get_values_serializer_class(self):
+        serializer = super().get_values_serializer_class()
+        fieldset = self.get_fieldset()
+        if serializer is None or fieldset is None:
+            return serializer
+        return serializer.prune(fieldset)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fieldset = self.get_fieldset()
+        if fieldset is None:
+            return queryset
+        serializer_fields = self.get_serializer_class()().fields
+        deferred = [
+            field.name
+            for field in queryset.model._meta.concrete_fields
+            if not field.primary_key
+            and not field.is_relation
+            and field.name in serializer_fields
+            and field.name not in fieldset
+        ]
+        return queryset.defer(*deferred) if deferred else queryset
@@ -0,0 +1,208 @@
+import datetime
+import decimal
+import json
+import time
+import uuid
+from unittest import skipIf
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Prefetch
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings, tag
+from django.test.utils import CaptureQueriesContext
+from django.utils.functional import lazy
+from rest_framework.renderers import JSONRenderer
+
+from courses.models import Course, Lesson
+from courses.serializers import CourseDetailSerializer
+from users.models import User
+
+from .metrics import InstrumentationMiddleware, QueryBudgetExceeded, registry
+from .renderers import ORJSONRenderer, orjson, stream_json_array
+
+
+@skipIf(orjson is None, "orjson is not installed")
+class ORJSONRendererTests(SimpleTestCase):
+    def assert_same_output(self, data):
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_matches_json_renderer(self):
+        utc = datetime.timezone.utc
+        cases = {
+            "scalars": [1, -1.5, 0.1, True, False, None, "text"],
+            "unicode": 'é ü 日本 \u2028 \u2029 "quoted" \\ \n',
+            # True would collide with 1, False is a distinct key.
+            "non_str_keys": {1: "a", 2.5: "b", False: "c"},
+            "decimal": decimal.Decimal("1.50"),
+            "datetime": datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=utc),
+            "datetime_us": datetime.datetime(2024, 1, 2, 3, 4, 5, 123456, tzinfo=utc),
+            "naive": datetime.datetime(2024, 1, 2, 3, 4, 5),
+            "date": datetime.date(2024, 1, 2),
+            "time": datetime.time(3, 4, 5),
+            "timedelta": datetime.timedelta(hours=1, microseconds=5),
+            "uuid": uuid.UUID(int=1),
+            "lazy": lazy(lambda: "lazy", str)(),
+            "nested": [{"a": [1, {"b": None}]}, (1, 2), set()],
+        }
+        for name, value in cases.items():
+            with self.subTest(name):
+                self.assert_same_output({name: value})
+
+    def test_integers_wider_than_64_bits_fall_back(self):
+        for value in (2**64, 2**70, -(2**70)):
+            with self.subTest(value=value):
+                self.assert_same_output({"big": value})
+        self.assertEqual(
+            json.loads(ORJSONRenderer().render({"big": 2**70})), {"big": 2**70}
+        )
+
+    def test_empty_body_for_none(self):
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+    def test_streamed_array_matches_rendered_list(self):
+        for size in (0, 1, 5, 12):
+            with self.subTest(size=size):
+                items = [{"id": index, "value": index / 3} for index in range(size)]
+                chunks = list(stream_json_array(iter(items), chunk_size=5))
+                self.assertEqual(b"".join(chunks), ORJSONRenderer().render(items))
+                self.assertEqual(len(chunks), -(-size // 5) + 1)
+
+
+class ORJSONRendererBenchmarkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        instructor = User.objects.create_user(
+            "instructor", password="password", role=User.Role.INSTRUCTOR
+        )
+        courses = Course.objects.bulk_create(
+            Course(
+                title=f"Course é {index}",
+                description="Description " * 10,
+                instructor=instructor,
+                is_published=True,
+            )
+            for index in range(200)
+        )
+        Lesson.objects.bulk_create(
+            Lesson(
+                title=f"Lesson {index}",
+                description="Description " * 5,
+                video_url="https://example.com/video",
+                course=course,
+            )
+            for course in courses
+            for index in range(10)
+        )
+
+    @tag("benchmark")
+    def test_benchmark_against_json_renderer(self):
+        courses = Course.objects.select_related("instructor").prefetch_related(
+            Prefetch(
+                "lessons",
+                queryset=Lesson.objects.filter(is_active=True),
+                to_attr="active_lessons",
+            )
+        )
+        data = CourseDetailSerializer(courses, many=True).data
+        page = {"count": len(data), "results": data}
+
+        def best_of(renderer, repeat=5):
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                renderer.render(page)
+                timings.append(time.perf_counter() - started)
+            return min(timings)
+
+        self.assertEqual(ORJSONRenderer().render(page), JSONRenderer().render(page))
+        print(
+            f"\nrender 200 course details with 10 lessons each: "
+            f"orjson {best_of(ORJSONRenderer()) * 1000:.2f} ms, "
+            f"JSONRenderer {best_of(JSONRenderer()) * 1000:.2f} ms"
+        )
+
+
+class InstrumentationMiddlewareTests(TestCase):
+    url = "/api/v1/courses/"
+    labels = 'view="course-list",action="list"'
+
+    def setUp(self):
+        # The anonymous catalog is cached, it has to hit the database here.
+        cache.clear()
+        registry.clear()
+        instructor = User.objects.create_user(
+            "instructor", password="password", role=User.Role.INSTRUCTOR
+        )
+        Course.objects.create(
+            title="Course",
+            description="Description",
+            instructor=instructor,
+            is_published=True,
+        )
+
+    def get_metric(self, name):
+        prefix = f"elearning_{name}{{{self.labels}}} "
+        for line in registry.render().splitlines():
+            if line.startswith(prefix):
+                return float(line[len(prefix) :])
+        return None
+
+    def test_records_queries_and_timings(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertEqual(self.get_metric("request_queries_count"), 1)
+        self.assertEqual(self.get_metric("request_queries_sum"), len(queries))
+        self.assertGreater(self.get_metric("request_duration_seconds_sum"), 0)
+        self.assertGreater(self.get_metric("request_db_seconds_sum"), 0)
+        self.assertIsNone(self.get_metric("query_budget_exceeded_total"))
+
+    def test_counts_the_queries_of_async_views(self):
+        response = async_to_sync(self.async_client.get)("/api/v1/async/courses/")
+        self.assertEqual(response.status_code, 200)
+        self.labels = 'view="async-course-list",action="get"'
+        self.assertEqual(self.get_metric("request_queries_count"), 1)
+        self.assertGreater(self.get_metric("request_queries_sum"), 0)
+
+    def test_runs_natively_in_either_mode(self):
+        def get_response(request):
+            return HttpResponse()
+
+        async def aget_response(request):
+            return HttpResponse()
+
+        self.assertFalse(iscoroutinefunction(InstrumentationMiddleware(get_response)))
+        self.assertTrue(iscoroutinefunction(InstrumentationMiddleware(aget_response)))
+
+    @override_settings(
+        QUERY_BUDGETS={"course-list:list": 1}, QUERY_BUDGET_ENFORCE=False
+    )
+    def test_exceeded_budget_is_logged(self):
+        with self.assertLogs("utils.metrics", "WARNING") as logs:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertIn("course-list (list) ran", logs.output[0])
+        self.assertIn("the budget is 1.", logs.output[0])
+        self.assertEqual(self.get_metric("query_budget_exceeded_total"), 1)
+
+    @override_settings(QUERY_BUDGETS={"course-list:list": 1}, QUERY_BUDGET_ENFORCE=True)
+    def test_exceeded_budget_raises_when_enforced(self):
+        with self.assertRaisesMessage(QueryBudgetExceeded, "the budget is 1."):
+            self.client.get(self.url)
+
+    def test_metrics_endpoint(self):
+        self.client.get(self.url)
+        response = self.client.get("/metrics/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["Content-Type"], "text/plain; version=0.0.4; charset=utf-8"
+        )
+        body = response.content.decode()
+        self.assertIn("# TYPE elearning_request_queries summary", body)
+        self.assertIn(f"elearning_request_queries_count{{{self.labels}}} 1", body)
+        # The scrapes themselves are not recorded.
+        self.assertNotIn('view="metrics"', body)
+
+    def test_metrics_endpoint_is_internal(self):
+        response = self.client.get("/metrics/", REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(response.status_code, 404)